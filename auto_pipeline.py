@@ -12,15 +12,84 @@ Usage:
 
 Configuration:
     Set LINKEDIN_EMAIL and LINKEDIN_PASSWORD in .env
+    Set LEAD_HEADLESS=0 to show the browser window (useful for debugging)
+    Set LINKEDIN_BROWSER_ENDPOINT to use a remote browser (see docker-compose.yml)
+    Set LINKEDIN_CDP_ENDPOINT to reuse your own running Chrome (remote debugging port)
+    Set LINKEDIN_PROFILE_DIR to keep the browser profile somewhere other than .chrome-profile
+    Set LEAD_SAVE_TO_DB=0 to keep scraped leads out of the web app's database
+    Set LEAD_MESSAGES_ZIP=1 to export outreach messages as one .zip per run
 """
 
 import os
 import sys
+import asyncio
+import threading
 from datetime import datetime
-from scrapers.linkedin_scraper import LinkedInScraper
-from scrapers.reddit_scraper import RedditScraper
-from processors.claude_processor import LeadProcessor
-from storage.storage import LeadStorage
+from concurrent.futures import ThreadPoolExecutor
+from log_setup import setup_logging
+
+
+log = setup_logging()
+
+
+class BackgroundAnalysis:
+    """
+    Analyzes leads on a background event loop while the caller keeps scraping
+    The scrapers use Playwright's sync API on the main thread, so the
+    asyncio side (LeadProcessor.process_stream_async) gets its own thread.
+    submit() blocks once QUEUE_SIZE leads are waiting, which keeps a fast
+    scraper from running far ahead of the LLM.
+    """
+
+    QUEUE_SIZE = 32
+
+    def __init__(self, processor, max_concurrency: int = 8, on_result=None):
+        self.processor = processor
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='analysis', daemon=True)
+        self.thread.start()
+        self.queue = self._call(self._make_queue())
+        self.future = asyncio.run_coroutine_threadsafe(
+            processor.process_stream_async(self.queue, max_concurrency=max_concurrency,
+                                           on_result=on_result),
+            self.loop
+        )
+
+    async def _make_queue(self):
+        return asyncio.Queue(maxsize=self.QUEUE_SIZE)
+
+    def _call(self, coro):
+        """Run a coroutine on the analysis loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, lead):
+        """Queue a lead for analysis"""
+        if self.future.done():
+            # The analyzer crashed; surface its error instead of blocking on a full queue
+            self.future.result()
+        self._call(self.queue.put(lead))
+
+    def finish(self):
+        """Signal the end of the leads and wait for every result"""
+        self._call(self.queue.put(None))
+        return self.future.result()
+
+    def __enter__(self):
+        return self
+
+    async def _cancel_all(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def __exit__(self, *exc):
+        # On an error or Ctrl-C, stop the in-flight LLM calls too
+        self._call(self._cancel_all())
+        self._call(self.processor.aclose())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
 
 
 def main():
@@ -32,137 +101,186 @@ def main():
     # Configuration
     SEARCH_QUERY = os.getenv('LEAD_SEARCH_QUERY', 'order management chaos India')
     LEAD_LIMIT = int(os.getenv('LEAD_LIMIT', '20'))
+    LEAD_RPM = int(os.getenv('LEAD_RPM', '50'))
+    LEAD_TPM = int(os.getenv('LEAD_TPM', '80000'))
     LINKEDIN_EMAIL = os.getenv('LINKEDIN_EMAIL', '')
     LINKEDIN_PASSWORD = os.getenv('LINKEDIN_PASSWORD', '')
+    LINKEDIN_BROWSER_ENDPOINT = os.getenv('LINKEDIN_BROWSER_ENDPOINT') or None
+    LINKEDIN_CDP_ENDPOINT = os.getenv('LINKEDIN_CDP_ENDPOINT') or None
+    LINKEDIN_PROFILE_DIR = os.getenv('LINKEDIN_PROFILE_DIR') or '.chrome-profile'
+    SAVE_TO_DB = os.getenv('LEAD_SAVE_TO_DB', '1') == '1'
+    MESSAGES_ZIP = os.getenv('LEAD_MESSAGES_ZIP', '0') == '1'
 
     if not LINKEDIN_EMAIL or not LINKEDIN_PASSWORD:
-        print("❌ Missing LinkedIn credentials!")
-        print("   Add to .env:")
-        print("   LINKEDIN_EMAIL=your-email@example.com")
-        print("   LINKEDIN_PASSWORD=your-password")
-        print()
+        log.error("❌ Missing LinkedIn credentials!")
+        log.info("   Add to .env:")
+        log.info("   LINKEDIN_EMAIL=your-email@example.com")
+        log.info("   LINKEDIN_PASSWORD=your-password")
+        log.info("")
         sys.exit(1)
 
+    # Heavy imports (LLM SDKs, then Playwright) only once we know we'll run
+    from processors.claude_processor import LeadProcessor
+    from processors.llm_backends import RateLimiter
+    from storage.storage import LeadStorage, dedupe_key
+
     # Initialize components
-    linkedin_scraper = LinkedInScraper(headless=False)  # headless=True to hide browser
-    reddit_scraper = RedditScraper()
-    processor = LeadProcessor(config_dir="config")
+    # Processor first: a missing API key or config file should stop us
+    # before any browser is launched or page is scraped
+    try:
+        processor = LeadProcessor(config_dir="config", rate_limiter=RateLimiter(LEAD_RPM, LEAD_TPM))
+    except (ValueError, OSError) as e:
+        log.error("❌ Cannot start processor: %s", e)
+        sys.exit(1)
     storage = LeadStorage(data_dir="data")
 
+    from scrapers.linkedin_scraper import LinkedInScraper
+    from scrapers.reddit_scraper import RedditScraper
+
+    linkedin_scraper = LinkedInScraper(
+        headless=os.getenv('LEAD_HEADLESS', '1') == '1',  # LEAD_HEADLESS=0 to watch the browser
+        user_data_dir=LINKEDIN_PROFILE_DIR,
+        browser_endpoint=LINKEDIN_BROWSER_ENDPOINT,
+        cdp_endpoint=LINKEDIN_CDP_ENDPOINT
+    )
+    reddit_scraper = RedditScraper()
+
     try:
         # =====================================================================
         # STEP 1: FIND LEADS
         # =====================================================================
-        print("📍 STEP 1: FINDING LEADS")
-        print(f"   Query: {SEARCH_QUERY}")
-        print(f"   Limit: {LEAD_LIMIT}")
-        print()
+        log.info("📍 STEP 1: FINDING LEADS")
+        log.info("   Query: %s", SEARCH_QUERY)
+        log.info("   Limit: %s", LEAD_LIMIT)
+        log.info("")
 
         all_leads = []
-        
-        # Scrape LinkedIn
-        if not linkedin_scraper.login(LINKEDIN_EMAIL, LINKEDIN_PASSWORD):
-            print("⚠️  LinkedIn Login failed. Skipping LinkedIn and proceeding to Reddit.")
-        else:
-            linkedin_leads = linkedin_scraper.search_posts(query=SEARCH_QUERY, limit=LEAD_LIMIT)
-            print(f"✅ Found {len(linkedin_leads)} leads from LinkedIn\n")
-            all_leads.extend(linkedin_leads)
+        seen = set()
 
-        # Scrape Reddit
-        reddit_leads = reddit_scraper.search_posts(query=SEARCH_QUERY, limit=LEAD_LIMIT)
-        print(f"✅ Found {len(reddit_leads)} leads from Reddit\n")
-        all_leads.extend(reddit_leads)
+        # Raw leads are written to disk as they arrive, so a crash mid-search keeps them.
+        # Each new lead is handed to the analyzer right away, so the LLM calls run
+        # while the scrapers are still scrolling and waiting between requests;
+        # each result is appended to the processed file as soon as it's ready.
+        with storage.open_raw_leads(source="linkedin_and_reddit_auto") as raw_file, \
+                storage.open_processed_results() as processed_file, \
+                BackgroundAnalysis(processor, max_concurrency=int(os.getenv('LEAD_CONCURRENCY', '8')),
+                                   on_result=processed_file.write) as analysis:
 
-        if not all_leads:
-            print("⚠️  No leads found from any source. Try different keywords.")
-            return
+            def found(lead):
+                raw_file.write(lead)
+                all_leads.append(lead)
+                # Reposts show up more than once; each copy would cost an LLM call
+                key = dedupe_key(lead)
+                if key not in seen:
+                    seen.add(key)
+                    analysis.submit(lead)
 
-        print(f"🎯 Total: Found {len(all_leads)} leads across all sources")
-        print()
+            # Scrape LinkedIn
+            # Saved browser profile usually means no login form is needed
+            if not linkedin_scraper.is_logged_in() and not linkedin_scraper.login(LINKEDIN_EMAIL, LINKEDIN_PASSWORD):
+                log.warning("⚠️  LinkedIn Login failed. Skipping LinkedIn and proceeding to Reddit.")
+            else:
+                linkedin_count = 0
+                for lead in linkedin_scraper.iter_posts(query=SEARCH_QUERY, limit=LEAD_LIMIT):
+                    found(lead)
+                    linkedin_count += 1
+                log.info("✅ Found %s leads from LinkedIn\n", linkedin_count)
 
-        # Save raw leads
-        raw_filename = storage.save_raw_leads(all_leads, source="linkedin_and_reddit_auto")
-        print(f"💾 Saved raw leads: {raw_filename}")
-        print()
+            # Scrape Reddit
+            reddit_count = 0
+            for lead in reddit_scraper.iter_posts(query=SEARCH_QUERY, limit=LEAD_LIMIT):
+                found(lead)
+                reddit_count += 1
+            log.info("✅ Found %s leads from Reddit\n", reddit_count)
 
-        # =====================================================================
-        # STEP 2: ENRICH BACKGROUNDS (Optional - currently minimal)
-        # =====================================================================
-        print("📍 STEP 2: ENRICHING LEAD BACKGROUNDS")
-        print("   (Skipping for now to avoid extra page loads)")
-        print()
+            if all_leads:
+                log.info("🎯 Total: Found %s leads across all sources", len(all_leads))
+                log.info("   Deduplicated: %s -> %s", len(all_leads), len(seen))
+                log.info("")
+                log.info("💾 Saved raw leads: %s", raw_file.path)
+                log.info("")
 
-        # enriched_leads = [scraper.enrich_lead(lead) for lead in leads]
+                # =============================================================
+                # STEP 2: ENRICH BACKGROUNDS (Optional - currently minimal)
+                # =============================================================
+                log.info("📍 STEP 2: ENRICHING LEAD BACKGROUNDS")
+                log.info("   (Skipping for now to avoid extra page loads)")
+                log.info("")
 
-        # =====================================================================
-        # STEP 3: AI ANALYSIS
-        # =====================================================================
-        print("📍 STEP 3: AI ANALYSIS & QUALIFICATION")
-        print()
+                # enriched_leads = [scraper.enrich_lead(lead) for lead in leads]
 
-        results = processor.process_batch(all_leads)
+                # =============================================================
+                # STEP 3: AI ANALYSIS
+                # =============================================================
+                log.info("📍 STEP 3: AI ANALYSIS & QUALIFICATION")
+                log.info("   (Started while scraping; waiting for the remaining leads)")
+                log.info("")
+
+            # One multi-row INSERT for the whole scrape, so the web dashboard sees them
+            if all_leads and SAVE_TO_DB:
+                try:
+                    storage.save_leads_to_db(all_leads)
+                except Exception as e:
+                    log.warning("⚠️  Could not add leads to the database: %s", e)
+
+            results = analysis.finish()
+
+        if not all_leads:
+            log.warning("⚠️  No leads found from any source. Try different keywords.")
+            return
 
         # =====================================================================
         # STEP 4: SAVE RESULTS
         # =====================================================================
-        print("\n📍 STEP 4: SAVING RESULTS")
-        print()
-
-        # Save processed results
-        processed_filename = storage.save_processed_results(results)
-        print(f"💾 Processed: {processed_filename}")
-
-        # Save qualified leads
-        qualified = [r for r in results if r['analysis'].get('score') in ['A+', 'A']]
-        if qualified:
-            json_file, csv_file = storage.save_qualified_leads(results)
-            print(f"💾 Qualified: {json_file}")
-            print(f"💾 CSV: {csv_file}")
-
-            # Export messages
-            message_dir = storage.export_messages_for_outreach(results)
-            print(f"💾 Messages: {message_dir}")
+        log.info("\n📍 STEP 4: SAVING RESULTS")
+        log.info("")
+
+        # The two writes touch separate files, so overlap them
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            qualified_future = pool.submit(storage.save_qualified_leads, results)
+            messages_future = pool.submit(storage.export_messages_for_outreach, results,
+                                          archive=MESSAGES_ZIP)
+        json_file, csv_file = qualified_future.result()
+        message_dir = messages_future.result()
+
+        log.info("💾 Processed: %s", processed_file.path)
+        if json_file:
+            log.info("💾 Qualified: %s", json_file)
+            log.info("💾 CSV: %s", csv_file)
+            log.info("💾 Messages: %s", message_dir)
         else:
-            print("⚠️  No qualified leads (A+/A)")
+            log.warning("⚠️  No qualified leads (A+/A)")
 
         # =====================================================================
         # FINAL SUMMARY
         # =====================================================================
-        print("\n" + "=" * 80)
-        print("🎯 PIPELINE COMPLETE")
-        print("=" * 80)
-
-        stats = {
-            'found': len(all_leads),
-            'a_plus': sum(1 for r in results if r['analysis'].get('score') == 'A+'),
-            'a': sum(1 for r in results if r['analysis'].get('score') == 'A'),
-            'b': sum(1 for r in results if r['analysis'].get('score') == 'B'),
-            'c': sum(1 for r in results if r['analysis'].get('score') == 'C'),
-            'error': sum(1 for r in results if r['analysis'].get('score') == 'ERROR'),
-        }
-
-        print(f"Leads found: {stats['found']}")
-        print(f"Qualified (A+/A): {stats['a_plus'] + stats['a']}")
-        print(f"  - A+ leads: {stats['a_plus']}")
-        print(f"  - A leads: {stats['a']}")
-        print(f"Not qualified (B/C): {stats['b'] + stats['c']}")
-        print()
-        print("✅ Check 'data/messages/' for outreach-ready messages!")
-        print("=" * 80)
+        log.info("\n" + "=" * 80)
+        log.info("🎯 PIPELINE COMPLETE")
+        log.info("=" * 80)
+
+        stats = storage.get_stats(results)
+
+        log.info("Leads found: %s", len(all_leads))
+        log.info("Analyzed (after dedupe): %s", stats['total'])
+        log.info("Qualified (A+/A): %s", stats['a_plus'] + stats['a'])
+        log.info("  - A+ leads: %s", stats['a_plus'])
+        log.info("  - A leads: %s", stats['a'])
+        log.info("Not qualified (B/C): %s", stats['b'] + stats['c'])
+        log.info("")
+        log.info("✅ Check 'data/messages/' for outreach-ready messages!")
+        log.info("=" * 80)
 
     except KeyboardInterrupt:
-        print("\n⚠️  Pipeline interrupted by user")
+        log.warning("\n⚠️  Pipeline interrupted by user")
 
     except Exception as e:
-        print(f"\n❌ Pipeline error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("\n❌ Pipeline error: %s", e)
 
     finally:
         # Cleanup
         linkedin_scraper.close()
         reddit_scraper.close()
-        print("\n🔒 Cleanup complete")
+        log.info("\n🔒 Cleanup complete")
 
 
 if __name__ == "__main__":
@@ -3,9 +3,14 @@ Example: Process Leads from Manual Collection
 This shows how to use vibe-leads with manually collected leads
 """
 
+import os
 import json
+import asyncio
 from processors.claude_processor import LeadProcessor
 from storage.storage import LeadStorage
+from log_setup import setup_logging
+
+log = setup_logging()
 
 
 def main():
@@ -75,15 +80,24 @@ def main():
         }
     ]
     
-    print("\n" + "="*80)
-    print("VIBE-LEADS: Quality-First Lead Generation")
-    print("="*80)
+    log.info("\n" + "="*80)
+    log.info("VIBE-LEADS: Quality-First Lead Generation")
+    log.info("="*80)
     
     # Save raw leads
     storage.save_raw_leads(sample_leads, source="manual_collection")
     
     # Process leads
-    results = processor.process_batch(sample_leads)
+    async def analyze():
+        try:
+            return await processor.process_batch_async(
+                sample_leads, max_concurrency=int(os.getenv('LEAD_CONCURRENCY', '8'))
+            )
+        finally:
+            # Pooled clients belong to this run's event loop
+            await processor.aclose()
+
+    results = asyncio.run(analyze())
     
     # Save results
     storage.save_processed_results(results)
@@ -92,16 +106,16 @@ def main():
     
     # Print summary
     stats = storage.get_stats(results)
-    print("\n" + "="*80)
-    print("FINAL SUMMARY")
-    print("="*80)
-    print(f"Total leads processed: {stats['total']}")
-    print(f"Qualified (A+/A): {stats['qualified']} ({stats['qualification_rate']:.1f}%)")
-    print(f"  - A+ leads: {stats['a_plus']}")
-    print(f"  - A leads: {stats['a']}")
-    print(f"Not qualified (B/C): {stats['b'] + stats['c']}")
-    print("\n✅ Check the 'data/messages' folder for outreach-ready messages!")
-    print("="*80)
+    log.info("\n" + "="*80)
+    log.info("FINAL SUMMARY")
+    log.info("="*80)
+    log.info("Total leads processed: %s", stats['total'])
+    log.info("Qualified (A+/A): %s (%.1f%%)", stats['qualified'], stats['qualification_rate'])
+    log.info("  - A+ leads: %s", stats['a_plus'])
+    log.info("  - A leads: %s", stats['a'])
+    log.info("Not qualified (B/C): %s", stats['b'] + stats['c'])
+    log.info("\n✅ Check the 'data/messages' folder for outreach-ready messages!")
+    log.info("="*80)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""
+Logging setup shared by the CLI scripts
+
+Records are handed to a queue and written by a background thread, so
+concurrent LLM workers never block on stdout.
+
+Usage:
+    from log_setup import setup_logging
+    log = setup_logging()
+"""
+
+import os
+import sys
+import queue
+import atexit
+import logging
+import logging.handlers
+
+
+def setup_logging(name: str = 'vibe', root: bool = True) -> logging.Logger:
+    """
+    Route the root logger through a QueueListener; level from LEAD_LOG_LEVEL
+    With root=False only the named logger (and its children) is routed, for
+    hosts such as uvicorn that configure the rest of logging themselves.
+    """
+    target = logging.getLogger() if root else logging.getLogger(name)
+    if not any(isinstance(h, logging.handlers.QueueHandler) for h in target.handlers):
+        records = queue.Queue(-1)
+        stream = logging.StreamHandler(sys.stdout)
+        stream.setFormatter(logging.Formatter('%(message)s'))
+        listener = logging.handlers.QueueListener(records, stream)
+        listener.start()
+        atexit.register(listener.stop)  # flushes whatever is still queued
+
+        target.addHandler(logging.handlers.QueueHandler(records))
+        target.setLevel(os.getenv('LEAD_LOG_LEVEL', 'INFO').upper())
+
+    return logging.getLogger(name)
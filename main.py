@@ -8,6 +8,7 @@ Usage:
     python main.py                    # Run web server
     python main.py --port 3000        # Custom port
     python main.py --host 0.0.0.0     # Expose to network
+    python main.py --dev              # Auto-reload on code changes (or VIBE_DEV=1)
 """
 
 import os
@@ -22,8 +23,9 @@ def main():
     parser = argparse.ArgumentParser(description='Vibe-Leads Web Application')
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to (default: 0.0.0.0)')
     parser.add_argument('--port', type=int, default=8000, help='Port to run on (default: 8000)')
-    parser.add_argument('--reload', action='store_true', default=True, help='Enable auto-reload (default: True)')
-    parser.add_argument('--no-reload', dest='reload', action='store_false', help='Disable auto-reload')
+    parser.add_argument('--dev', '--reload', dest='reload', action='store_true',
+                        default=os.getenv('VIBE_DEV') == '1',
+                        help='Enable auto-reload for development (default: off, or VIBE_DEV=1)')
     args = parser.parse_args()
 
     # Print banner
@@ -56,12 +58,16 @@ def main():
     print()
 
     # Run the application
+    # One process by default: analysis jobs and the page/count caches live in
+    # process memory, so extra workers only make sense once those are shared
+    workers = None if args.reload else int(os.getenv('WEB_WORKERS', '1'))
     try:
         uvicorn.run(
             "web.main:app",
             host=args.host,
             port=args.port,
             reload=args.reload,
+            workers=workers,
             log_level="info"
         )
     except KeyboardInterrupt:
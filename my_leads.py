@@ -5,9 +5,13 @@ My Leads - Add your real leads here and process them
 Usage: python3 my_leads.py
 """
 
-from processors.claude_processor import LeadProcessor
-from storage.storage import LeadStorage
+import os
+import asyncio
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from log_setup import setup_logging
+
+log = setup_logging()
 
 
 # ============================================================================
@@ -53,6 +57,8 @@ my_leads = [
 # PROCESSING CODE (Don't change this unless you know what you're doing)
 # ============================================================================
 
+TEMPLATE_NAME = 'Example Person'
+
 def main():
     print("""
 ╔═══════════════════════════════════════════════════════════════╗
@@ -61,71 +67,101 @@ def main():
 ╚═══════════════════════════════════════════════════════════════╝
     """)
 
-    if not my_leads:
-        print("❌ No leads found!")
-        print("\n💡 Add your leads to the my_leads list above.")
-        print("   Copy the template and fill in:")
-        print("   - name, title, company")
-        print("   - content (their actual post/message)")
-        print("   - source and URL")
+    # The untouched template entry is a placeholder, never worth an LLM call
+    real_leads = [lead for lead in my_leads if lead.get('name') != TEMPLATE_NAME]
+
+    if not real_leads:
+        log.error("❌ No leads found!")
+        log.info("\n💡 Add your leads to the my_leads list above.")
+        log.info("   Copy the template and fill in:")
+        log.info("   - name, title, company")
+        log.info("   - content (their actual post/message)")
+        log.info("   - source and URL")
         return
 
-    print(f"📊 Found {len(my_leads)} leads to process\n")
+    log.info("📊 Found %s leads to process\n", len(real_leads))
+
+    # Heavy imports (LLM SDKs) only once there is something to process
+    from processors.claude_processor import LeadProcessor
+    from processors.llm_backends import RateLimiter
+    from storage.storage import LeadStorage, dedupe_leads
 
     # Initialize processor and storage
-    processor = LeadProcessor(config_dir="config")
+    LEAD_RPM = int(os.getenv('LEAD_RPM', '50'))
+    LEAD_TPM = int(os.getenv('LEAD_TPM', '80000'))
+    processor = LeadProcessor(config_dir="config", rate_limiter=RateLimiter(LEAD_RPM, LEAD_TPM))
     storage = LeadStorage(data_dir="data")
 
+    # Guard against a lead pasted twice. Keyed on content only, since
+    # copies of the template often keep its placeholder URL
+    leads = dedupe_leads(real_leads, by_url=False)
+    if len(leads) < len(real_leads):
+        log.info("   Deduplicated: %s -> %s\n", len(real_leads), len(leads))
+
     # Save raw leads
-    storage.save_raw_leads(my_leads, source="my_leads")
+    storage.save_raw_leads(leads, source="my_leads")
 
     # Process all leads
-    print("🤖 Analyzing leads with Claude AI...\n")
-    results = processor.process_batch(my_leads)
+    log.info("🤖 Analyzing leads with Claude AI...\n")
+    async def analyze():
+        try:
+            return await processor.process_batch_async(
+                leads, max_concurrency=int(os.getenv('LEAD_CONCURRENCY', '8'))
+            )
+        finally:
+            # Pooled clients belong to this run's event loop
+            await processor.aclose()
+
+    results = asyncio.run(analyze())
 
     # Save results
-    print("\n💾 Saving results...")
-    storage.save_processed_results(results, source="my_leads")
-    storage.save_qualified_leads(results, source="my_leads")
-    storage.export_messages_for_outreach(results, source="my_leads")
+    log.info("\n💾 Saving results...")
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        saves = [
+            pool.submit(storage.save_processed_results, results, source="my_leads"),
+            pool.submit(storage.save_qualified_leads, results, source="my_leads"),
+            pool.submit(storage.export_messages_for_outreach, results, source="my_leads"),
+        ]
+    for save in saves:
+        save.result()  # re-raise any write error
 
     # Print summary
-    print("\n" + "="*60)
-    print("✅ PROCESSING COMPLETE!")
-    print("="*60)
+    log.info("\n" + "="*60)
+    log.info("✅ PROCESSING COMPLETE!")
+    log.info("="*60)
 
     # Get stats
     stats = storage.get_stats(results)
-    print(f"\n📈 RESULTS:")
-    print(f"   Total processed: {stats['total']}")
-    print(f"   A+ leads: {stats['a_plus']} ({stats['a_plus_pct']:.1f}%)")
-    print(f"   A leads: {stats['a']} ({stats['a_pct']:.1f}%)")
-    print(f"   B leads: {stats['b']} ({stats['b_pct']:.1f}%)")
-    print(f"   C leads: {stats['c']} ({stats['c_pct']:.1f}%)")
-    print(f"   Errors: {stats['errors']}")
+    log.info("\n📈 RESULTS:")
+    log.info("   Total processed: %s", stats['total'])
+    log.info("   A+ leads: %s (%.1f%%)", stats['a_plus'], stats['a_plus_pct'])
+    log.info("   A leads: %s (%.1f%%)", stats['a'], stats['a_pct'])
+    log.info("   B leads: %s (%.1f%%)", stats['b'], stats['b_pct'])
+    log.info("   C leads: %s (%.1f%%)", stats['c'], stats['c_pct'])
+    log.info("   Errors: %s", stats['errors'])
 
     qualified = stats['a_plus'] + stats['a']
-    print(f"\n⭐ {qualified} QUALIFIED LEADS ready for outreach!")
+    log.info("\n⭐ %s QUALIFIED LEADS ready for outreach!", qualified)
 
     if qualified > 0:
-        print(f"\n📧 Check these files:")
-        print(f"   • data/qualified/qualified_my_leads_*.csv  (spreadsheet)")
-        print(f"   • data/messages/batch_my_leads_*/  (ready-to-send messages)")
-        print(f"\n💡 Open the .txt files in data/messages/ and start sending!")
+        log.info("\n📧 Check these files:")
+        log.info("   • data/qualified/qualified_my_leads_*.csv  (spreadsheet)")
+        log.info("   • data/messages/batch_my_leads_*/  (ready-to-send messages)")
+        log.info("\n💡 Open the .txt files in data/messages/ and start sending!")
     else:
-        print(f"\n💡 No qualified leads this time. Try:")
-        print(f"   • Look for leads with more specific pain points")
-        print(f"   • Ensure they're decision makers (Owner, Director)")
-        print(f"   • Check that content has urgency indicators")
-
-    print("\n" + "="*60)
-    print("🎯 Next steps:")
-    print("   1. Review qualified leads in data/qualified/")
-    print("   2. Open message files in data/messages/")
-    print("   3. Customize messages slightly if needed")
-    print("   4. Send to LinkedIn/Email")
-    print("   5. Track responses!")
-    print("="*60 + "\n")
+        log.info("\n💡 No qualified leads this time. Try:")
+        log.info("   • Look for leads with more specific pain points")
+        log.info("   • Ensure they're decision makers (Owner, Director)")
+        log.info("   • Check that content has urgency indicators")
+
+    log.info("\n" + "="*60)
+    log.info("🎯 Next steps:")
+    log.info("   1. Review qualified leads in data/qualified/")
+    log.info("   2. Open message files in data/messages/")
+    log.info("   3. Customize messages slightly if needed")
+    log.info("   4. Send to LinkedIn/Email")
+    log.info("   5. Track responses!")
+    log.info("="*60 + "\n")
 
 
 if __name__ == "__main__":
@@ -11,11 +11,180 @@ Supports multiple LLM backends:
 
 import os
 import re
+import asyncio
+import hashlib
+import functools
+import logging
 import yaml
 import json
-from typing import Dict, List, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Callable
 from datetime import datetime
-from processors.llm_backends import get_llm_backend
+from processors.llm_backends import get_llm_backend, RateLimiter, RateLimitedBackend, CachedBackend
+
+
+log = logging.getLogger('vibe.processor')
+
+ANALYSIS_SYSTEM_MESSAGE = "You are an expert lead qualification analyst for B2B sales."
+MESSAGE_SYSTEM_MESSAGE = "You are an expert at writing personalized, vibe-matched outreach messages."
+
+# Optional cheap first pass that screens out obvious C leads before the
+# full analysis (LLM_TRIAGE_PROVIDER). Anything but a clear DISQUALIFY keeps the lead.
+TRIAGE_SYSTEM_MESSAGE = (
+    "You screen social media posts for a B2B sales team. Reply with exactly one word: "
+    "DISQUALIFY if the post is spam or self-promotion, written by a student or researcher, "
+    "or describes no business problem at all; otherwise KEEP. When unsure, reply KEEP."
+)
+TRIAGE_PROMPT_TEMPLATE = """Return DISQUALIFY or KEEP for this post:
+\"\"\"{content}\"\"\"
+"""
+_TRIAGE_VERDICT_RE = re.compile(r'\b(DISQUALIFY|KEEP)\b', re.IGNORECASE)
+# The gist of a post is enough to spot spam
+TRIAGE_CONTENT_TOKENS = 200
+
+# Fenced code blocks or a bare object start in LLM replies, compiled once
+_EXTRACT_RE = re.compile(r'```json\s*(.*?)```|```\s*(\{.*?)```|\{', re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_loads(text):
+    """Parse JSON with orjson when installed (same results, several times faster)"""
+    return orjson.loads(text) if orjson is not None else json.loads(text)
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, stringifying unknown types like datetime"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=str, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
+
+# "Here's the personalized outreach message:" and friends (local models often add these)
+_PREAMBLE_RE = re.compile(
+    r"^(?:"
+    r"(?:sure[,!]?\s+)?here(?:['’]s|\s+is)\s+(?:the|a)\s+(?:personalized\s+)?outreach\s+message:"
+    r"|sure[,!]?\s+here(?:['’]s|\s+is)\b"
+    r")\s*",
+    re.IGNORECASE
+)
+
+# Provider responses that mean no further call in the batch can succeed
+FATAL_STATUS_CODES = frozenset({401, 403})
+
+# Scores that get an outreach message
+QUALIFIED_SCORES = frozenset({'A+', 'A', 'B'})
+ANALYSIS_SCORES = QUALIFIED_SCORES | {'C'}
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    class AnalysisSchema(msgspec.Struct):
+        """Field types of the JSON object the analysis prompt asks for (null allowed but for score)"""
+        score: str
+        pain_points: Optional[List[str]] = None
+        pain_clarity: Optional[str] = None
+        urgency: Optional[str] = None
+        authority: Optional[str] = None
+        specificity_score: Optional[int] = None
+        industry_fit: Optional[bool] = None
+        size_fit: Optional[bool] = None
+        disqualify: Optional[bool] = None
+        disqualify_reason: Optional[str] = None
+        reasoning: Optional[str] = None
+        key_signals: Optional[List[str]] = None
+        missing_signals: Optional[List[str]] = None
+
+# Values that replace a null in the model's reply (e.g. "disqualify_reason": null)
+ANALYSIS_NULL_DEFAULTS = {
+    'pain_points': [],
+    'pain_clarity': '',
+    'urgency': '',
+    'authority': '',
+    'specificity_score': 0,
+    'industry_fit': False,
+    'size_fit': False,
+    'disqualify': False,
+    'disqualify_reason': '',
+    'reasoning': '',
+    'key_signals': [],
+    'missing_signals': [],
+}
+
+# Outreach messages are capped at 150 words; this leaves room for a preamble
+MESSAGE_MAX_TOKENS = 300
+# Longest preamble _strip_preamble looks for, with slack for leading whitespace
+PREAMBLE_WINDOW = 100
+
+# Lead content longer than CONTENT_HARD_TOKENS is cut to CONTENT_SOFT_TOKENS,
+# split between head and tail (pain signals cluster early, sign-offs late)
+CONTENT_SOFT_TOKENS = 400
+CONTENT_HARD_TOKENS = 600
+TRUNCATION_MARKER = "\n...[truncated]...\n"
+
+# Lead fields the analysis and message prompts read: a cached result (message
+# included) is only reused for a lead that matches on all of them. 'date' is
+# left out so a repost scraped on a later day still hits.
+CACHE_KEY_FIELDS = ('name', 'title', 'company', 'source', 'content')
+
+# libyaml's C loader when available, the pure-Python one otherwise
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=1)
+def _token_encoding():
+    """tiktoken's cl100k encoding (close enough for every provider), or None if unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_file(path: str, mtime: float) -> dict:
+    """Parse a YAML file once per (path, mtime); callers treat the result as read-only"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
+# Per-lead halves of the prompts; the static halves live in the system prompts.
+# Filled with str.format_map, so braces inside lead content are left alone.
+ANALYSIS_PROMPT_TEMPLATE = """LEAD TO ANALYZE:
+Name: {name}
+Title: {title}
+Company: {company}
+Source: {source}
+Date: {date}
+
+What they said:
+\"\"\"{content}\"\"\"
+
+Reply with ONLY the JSON object described in your instructions.
+"""
+
+MESSAGE_PROMPT_TEMPLATE = """LEAD CONTEXT:
+Name: {name}
+Title: {title}
+Company: {company}
+
+What they said:
+\"\"\"{content}\"\"\"
+
+ANALYSIS:
+Pain points: {pain_points}
+Urgency: {urgency}
+Authority: {authority}
+Key signals: {key_signals}
+
+{pain_points_section}
+"""
 
 
 def extract_json(text: str) -> dict:
@@ -26,36 +195,26 @@ def extract_json(text: str) -> dict:
     # Strip whitespace
     text = text.strip()
 
-    # Try 1: ```json ... ```
-    m = re.search(r'```json\s*([\s\S]*?)```', text)
-    if m:
-        return json.loads(m.group(1).strip())
-
-    # Try 2: ``` ... ```
-    m = re.search(r'```\s*([\s\S]*?)```', text)
-    if m:
-        candidate = m.group(1).strip()
-        if candidate.startswith('{'):
-            return json.loads(candidate)
-
-    # Try 3: Find the first { ... } block (handles text before/after JSON)
-    start = text.find('{')
-    if start != -1:
-        # Walk forward counting braces to find the matching close
-        depth = 0
-        for i, ch in enumerate(text[start:], start):
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-            if depth == 0:
-                return json.loads(text[start:i+1])
+    # One left-to-right pass: a ```json block, a ``` block holding an object,
+    # or a bare { that starts valid JSON (handles text before/after JSON, and
+    # braces inside string values)
+    for m in _EXTRACT_RE.finditer(text):
+        fenced = m.group(1) if m.group(1) is not None else m.group(2)
+        if fenced is not None:
+            return _json_loads(fenced.strip())
+        try:
+            obj, _end = _DECODER.raw_decode(text, m.start())
+            return obj
+        except ValueError:
+            continue
 
     # Try 4: Raw JSON
-    return json.loads(text)
+    return _json_loads(text)
 
 class LeadProcessor:
-    def __init__(self, config_dir: str = "config", llm_provider: Optional[str] = None):
+    def __init__(self, config_dir: str = "config", llm_provider: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None, cache_dir: Optional[str] = None,
+                 triage_provider: Optional[str] = None):
         """
         Initialize with configuration files
 
@@ -63,50 +222,127 @@ class LeadProcessor:
             config_dir: Path to configuration directory
             llm_provider: Force specific LLM ('claude', 'openai', 'gemini', 'ollama')
                          If None, auto-detects from available API keys
+            rate_limiter: Optional RPM/TPM limiter applied to every LLM call
+            cache_dir: Where analyzed leads are cached by a hash of the prompt fields
+                      (defaults to LEAD_CACHE_DIR, unset disables)
+            triage_provider: Cheap LLM that rejects obvious C leads before the full
+                            analysis (defaults to LLM_TRIAGE_PROVIDER, unset disables)
         """
         self.config_dir = config_dir
         self.company = self._load_yaml("company.yaml")
         self.audience = self._load_yaml("audience.yaml")
         self.pain_points = self._load_yaml("pain_points.yaml")
+        # (lowercased name, definition) in config order, so matching detected
+        # pains doesn't re-lower every name per lead
+        self._pain_index = [
+            (pain_def['name'].lower(), pain_def)
+            for pain_def in self.pain_points['pain_points']['primary_pains']
+        ]
+
+        # Everything but the lead itself is fixed per run, so build it once
+        self.analysis_system = self._build_analysis_system()
+        self.message_system = self._build_message_system()
 
         # Initialize LLM backend (auto-detects or uses specified provider)
-        self.llm = get_llm_backend(llm_provider)
+        # and wrap it with provider-default pacing and adaptive concurrency
+        self.llm = RateLimitedBackend(get_llm_backend(llm_provider))
+        if rate_limiter:
+            self.llm.rate_limiter = rate_limiter
+        if os.getenv('LLM_CACHE') == '1':
+            self.llm = CachedBackend(self.llm)
+
+        self.triage_llm = None
+        triage_provider = triage_provider or os.getenv('LLM_TRIAGE_PROVIDER')
+        if triage_provider:
+            try:
+                self.triage_llm = RateLimitedBackend(get_llm_backend(triage_provider))
+            except ValueError as e:
+                log.warning("⚠️  Triage disabled: %s", e)
+
+        self.cache_dir = cache_dir or os.getenv('LEAD_CACHE_DIR')
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
     
     def _load_yaml(self, filename: str) -> dict:
         """Load YAML configuration file"""
-        path = os.path.join(self.config_dir, filename)
-        with open(path, 'r') as f:
-            return yaml.safe_load(f)
+        path = os.path.abspath(os.path.join(self.config_dir, filename))
+        return _load_yaml_file(path, os.path.getmtime(path))
     
-    def _build_analysis_prompt(self, lead: Dict) -> str:
+    def _template_mtime(self) -> float:
+        """Latest change to anything the prompts are built from"""
+        sources = [__file__] + [
+            os.path.join(self.config_dir, f)
+            for f in ("company.yaml", "audience.yaml", "pain_points.yaml")
+        ]
+        return max(os.path.getmtime(path) for path in sources)
+
+    def _cache_path(self, lead: Dict) -> str:
+        """Cache file for a lead, keyed by the fields the analysis and message prompts read"""
+        key = hashlib.sha256(json.dumps(
+            {k: lead.get(k) for k in CACHE_KEY_FIELDS},
+            sort_keys=True
+        ).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cached_result(self, lead: Dict) -> Optional[Dict]:
+        """Return a previous result for identical lead content, if still valid"""
+        if not self.cache_dir:
+            return None
+
+        path = self._cache_path(lead)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'rb') as f:
+                entry = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        # Prompt templates changed since this was cached
+        if entry.get('template_mtime') != self._template_mtime():
+            return None
+
+        # Stored without per-run metadata: stamp it for this lead
+        analysis = dict(entry['analysis'],
+                        analyzed_at=datetime.now().isoformat(),
+                        lead_id=lead.get('id', lead.get('url', 'unknown')))
+        return self._build_result(lead, analysis, entry['message'])
+
+    def _save_cached_result(self, lead: Dict, result: Dict):
+        """Write a fresh result through to the cache (errors are not cached)"""
+        if not self.cache_dir or result.get('status') != 'success':
+            return
+        # A triage rejection depends on the triage model, not just the lead
+        if result['analysis'].get('triaged'):
+            return
+
+        with open(self._cache_path(lead), 'wb') as f:
+            f.write(_json_dumps({
+                'template_mtime': self._template_mtime(),
+                'analysis': {k: v for k, v in result['analysis'].items()
+                             if k not in ('analyzed_at', 'lead_id')},
+                'message': result['message'],
+            }))
+
+    def _build_analysis_system(self) -> str:
         """
-        Build the Claude prompt for lead analysis
-        This is where the magic happens - quality comes from prompt quality
+        Static part of the analysis prompt: company, audience and scoring rubric
+        Built once per processor; only the lead block changes between calls
         """
-        
-        prompt = f"""You are an expert lead qualification analyst for B2B sales.
+        return f"""{ANALYSIS_SYSTEM_MESSAGE}
 
 COMPANY CONTEXT:
 Product: {self.company['company']['name']} - {self.company['company']['product']}
-What we solve: {', '.join(self.company['value_propositions']['primary'])}
+What we solve: {', '.join(self.company['value_propositions']['primary'][:5])}
 
 TARGET AUDIENCE:
 - Industries: {', '.join(self.audience['audience']['industries']['high_priority'])}
 - Titles: {', '.join(self.audience['audience']['titles']['primary'])}
 - Location: {', '.join(self.audience['audience']['locations']['primary'])}
 
-LEAD TO ANALYZE:
-Name: {lead.get('name', 'Unknown')}
-Title: {lead.get('title', 'Unknown')}
-Company: {lead.get('company', 'Unknown')}
-Source: {lead.get('source', 'Unknown')}
-Date: {lead.get('date', 'Unknown')}
-
-What they said:
-\"\"\"{lead.get('content', '')}\"\"\"
-
 YOUR TASK:
-Analyze this lead with EXTREME RIGOR. We care about QUALITY over quantity.
+Analyze the lead in the user message with EXTREME RIGOR. We care about QUALITY over quantity.
 
 1. PAIN POINT DETECTION:
    - Does this person explicitly or implicitly mention operational challenges?
@@ -165,19 +401,45 @@ Required fields:
 
 BE STRICT. Only A+ and A leads are worth pursuing. When in doubt, score lower.
 """
-        
-        return prompt
-    
-    def _build_message_prompt(self, lead: Dict, analysis: Dict) -> str:
+
+    @staticmethod
+    def _truncate_content(content: str, soft: int = CONTENT_SOFT_TOKENS,
+                          hard: int = CONTENT_HARD_TOKENS) -> str:
+        """Keep the head and tail of very long posts so prompts stay small"""
+        encoding = _token_encoding()
+        if encoding is None:
+            # ~4 characters per token without a tokenizer
+            if len(content) <= hard * 4:
+                return content
+            half = soft * 2
+            return content[:half] + TRUNCATION_MARKER + content[-half:]
+
+        tokens = encoding.encode(content)
+        if len(tokens) <= hard:
+            return content
+        half = soft // 2
+        return encoding.decode(tokens[:half]) + TRUNCATION_MARKER + encoding.decode(tokens[-half:])
+
+    def _build_analysis_prompt(self, lead: Dict) -> str:
         """
-        Build prompt for generating vibe-matched outreach message
-        Only called for A+ and A leads
+        Build the Claude prompt for lead analysis
+        This is where the magic happens - quality comes from prompt quality
         """
         
-        # Get relevant pain point examples
-        pain_points_section = self._get_pain_point_context(analysis['pain_points'])
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format_map({
+            'name': lead.get('name', 'Unknown'),
+            'title': lead.get('title', 'Unknown'),
+            'company': lead.get('company', 'Unknown'),
+            'source': lead.get('source', 'Unknown'),
+            'date': lead.get('date', 'Unknown'),
+            'content': self._truncate_content(lead.get('content', '')),
+        })
         
-        prompt = f"""You are an expert at writing personalized B2B outreach messages that feel authentic and helpful, not salesy.
+        return prompt
+    
+    def _build_message_system(self) -> str:
+        """Static part of the message prompt: company voice and writing rules"""
+        return f"""{MESSAGE_SYSTEM_MESSAGE}
 
 COMPANY CONTEXT:
 Product: {self.company['company']['name']} - {self.company['company']['product']}
@@ -187,24 +449,8 @@ Language: {self.company['communication_style']['language']}
 AVOID: {', '.join(self.company['communication_style']['avoid'])}
 PREFER: {', '.join(self.company['communication_style']['prefer'])}
 
-LEAD CONTEXT:
-Name: {lead.get('name', 'Unknown')}
-Title: {lead.get('title', 'Unknown')}
-Company: {lead.get('company', 'Unknown')}
-
-What they said:
-\"\"\"{lead.get('content', '')}\"\"\"
-
-ANALYSIS:
-Pain points: {', '.join(analysis['pain_points'])}
-Urgency: {analysis['urgency']}
-Authority: {analysis['authority']}
-Key signals: {', '.join(analysis.get('key_signals', []))}
-
-{pain_points_section}
-
 YOUR TASK:
-Write a PERSONALIZED outreach message that:
+Write a PERSONALIZED outreach message for the lead in the user message that:
 
 1. MATCHES THEIR VIBE:
    - If frustrated/urgent → Acknowledge the pain, be direct
@@ -243,6 +489,27 @@ EXAMPLE STRUCTURE:
 Return ONLY the message text, no extra formatting or explanation.
 The message should feel like it's from a peer who genuinely wants to help, not a salesperson.
 """
+
+    def _build_message_prompt(self, lead: Dict, analysis: Dict) -> str:
+        """
+        Build prompt for generating vibe-matched outreach message
+        Only called for A+ and A leads
+        """
+        
+        # Get relevant pain point examples
+        pain_points_section = self._get_pain_point_context(analysis['pain_points'])
+        
+        prompt = MESSAGE_PROMPT_TEMPLATE.format_map({
+            'name': lead.get('name', 'Unknown'),
+            'title': lead.get('title', 'Unknown'),
+            'company': lead.get('company', 'Unknown'),
+            'content': self._truncate_content(lead.get('content', '')),
+            'pain_points': ', '.join(analysis['pain_points']),
+            'urgency': analysis['urgency'],
+            'authority': analysis['authority'],
+            'key_signals': ', '.join(analysis.get('key_signals', [])),
+            'pain_points_section': pain_points_section,
+        })
         
         return prompt
     
@@ -251,8 +518,9 @@ The message should feel like it's from a peer who genuinely wants to help, not a
         context_parts = []
         
         for pain in detected_pains:
-            for pain_def in self.pain_points['pain_points']['primary_pains']:
-                if pain.lower() in pain_def['name'].lower():
+            needle = pain.lower()
+            for name, pain_def in self._pain_index:
+                if needle in name:
                     examples = pain_def.get('ideal_lead_examples', [])
                     if examples:
                         context_parts.append(f"\n{pain_def['name']} examples:")
@@ -260,45 +528,171 @@ The message should feel like it's from a peer who genuinely wants to help, not a
         
         return '\n'.join(context_parts) if context_parts else ""
     
+    def _build_triage_prompt(self, lead: Dict) -> str:
+        """Short keep/disqualify prompt for the triage model"""
+        return TRIAGE_PROMPT_TEMPLATE.format_map({
+            'content': self._truncate_content(
+                lead.get('content', ''), soft=TRIAGE_CONTENT_TOKENS, hard=TRIAGE_CONTENT_TOKENS
+            ),
+        })
+
+    def _triage_analysis(self, response_text: str, lead: Dict) -> Optional[Dict]:
+        """C-grade analysis if the triage model rejected the lead, None to keep it"""
+        verdict = _TRIAGE_VERDICT_RE.search(response_text)
+        if verdict is None or verdict.group(1).upper() != 'DISQUALIFY':
+            return None
+
+        return {
+            'score': 'C',
+            'pain_points': [],
+            'pain_clarity': 'NONE',
+            'urgency': 'NONE',
+            'authority': 'UNKNOWN',
+            'specificity_score': 1,
+            'industry_fit': False,
+            'size_fit': False,
+            'disqualify': True,
+            'disqualify_reason': 'Rejected by triage (spam, student or no business pain)',
+            'reasoning': 'Screened out by the triage model before full analysis.',
+            'key_signals': [],
+            'missing_signals': [],
+            'triaged': True,
+            'analyzed_at': datetime.now().isoformat(),
+            'lead_id': lead.get('id', lead.get('url', 'unknown')),
+        }
+
+    def _triage(self, lead: Dict) -> Optional[Dict]:
+        """Run the triage model; failures keep the lead for the full analysis"""
+        if self.triage_llm is None:
+            return None
+        try:
+            response_text = self.triage_llm.generate(
+                prompt=self._build_triage_prompt(lead),
+                system_message=TRIAGE_SYSTEM_MESSAGE
+            )
+        except Exception as e:
+            log.warning("Triage failed, running full analysis: %s", e)
+            return None
+        return self._triage_analysis(response_text, lead)
+
+    async def _triage_async(self, lead: Dict) -> Optional[Dict]:
+        """Async variant of _triage"""
+        if self.triage_llm is None:
+            return None
+        try:
+            response_text = await self.triage_llm.generate_async(
+                prompt=self._build_triage_prompt(lead),
+                system_message=TRIAGE_SYSTEM_MESSAGE
+            )
+        except Exception as e:
+            log.warning("Triage failed, running full analysis: %s", e)
+            return None
+        return self._triage_analysis(response_text, lead)
+
+    def _parse_analysis(self, response_text: str, lead: Dict) -> Dict:
+        """Turn raw LLM output into an analysis dict with metadata"""
+        # Extract JSON from response (handles markdown blocks, raw JSON, etc.)
+        analysis = extract_json(response_text)
+        self._validate_analysis(analysis)
+
+        # Add metadata
+        analysis['analyzed_at'] = datetime.now().isoformat()
+        analysis['lead_id'] = lead.get('id', lead.get('url', 'unknown'))
+
+        return analysis
+
+    @staticmethod
+    def _validate_analysis(analysis) -> None:
+        """
+        Reject replies that don't match the prompt's contract before they reach storage
+        Only a missing or unknown score is fatal; null fields get their defaults.
+        """
+        if not isinstance(analysis, dict) or analysis.get('score') not in ANALYSIS_SCORES:
+            score = analysis.get('score') if isinstance(analysis, dict) else None
+            raise ValueError(f"Unexpected analysis score: {score!r}")
+        if msgspec is not None:
+            # Lax mode accepts "7" for 7 and the like; raises on wrong shapes.
+            # The coerced values replace the raw ones, so what is stored is
+            # what was checked
+            checked = msgspec.to_builtins(msgspec.convert(analysis, type=AnalysisSchema, strict=False))
+            analysis.update((field, value) for field, value in checked.items() if field in analysis)
+        for field, default in ANALYSIS_NULL_DEFAULTS.items():
+            if field in analysis and analysis[field] is None:
+                analysis[field] = list(default) if isinstance(default, list) else default
+
+    def _error_analysis(self, error: Exception) -> Dict:
+        """Analysis placeholder for a lead that failed to process"""
+        log.warning("Error analyzing lead: %s", error)
+        analysis = {
+            "score": "ERROR",
+            "error": str(error),
+            "analyzed_at": datetime.now().isoformat()
+        }
+        # A rejected API key fails every remaining lead the same way
+        if getattr(error, 'status_code', None) in FATAL_STATUS_CODES:
+            analysis["fatal"] = True
+        return analysis
+
+    def _clean_message(self, outreach_message: str) -> str:
+        """Strip common LLM preambles (local models often add these)"""
+        return self._strip_preamble(outreach_message).strip()
+
+    @staticmethod
+    def _strip_preamble(outreach_message: str) -> str:
+        """Drop a leading "here is the message:" style preamble, keeping the tail untouched"""
+        return _PREAMBLE_RE.sub('', outreach_message.lstrip(), count=1)
+
     def analyze_lead(self, lead: Dict) -> Dict:
         """
         Analyze a single lead for quality
         Returns analysis with score and detailed reasoning
         """
 
+        triaged = self._triage(lead)
+        if triaged is not None:
+            return triaged
+
         try:
             prompt = self._build_analysis_prompt(lead)
 
             # Use LLM backend (works with any configured LLM)
             response_text = self.llm.generate(
                 prompt=prompt,
-                system_message="You are an expert lead qualification analyst for B2B sales."
+                system_message=self.analysis_system
             )
-            
-            # Extract JSON from response (handles markdown blocks, raw JSON, etc.)
-            analysis = extract_json(response_text)
-            
-            # Add metadata
-            analysis['analyzed_at'] = datetime.now().isoformat()
-            analysis['lead_id'] = lead.get('id', lead.get('url', 'unknown'))
-            
-            return analysis
-            
+
+            return self._parse_analysis(response_text, lead)
+
         except Exception as e:
-            print(f"Error analyzing lead: {e}")
-            return {
-                "score": "ERROR",
-                "error": str(e),
-                "analyzed_at": datetime.now().isoformat()
-            }
-    
+            return self._error_analysis(e)
+
+    async def analyze_lead_async(self, lead: Dict) -> Dict:
+        """Async variant of analyze_lead"""
+
+        triaged = await self._triage_async(lead)
+        if triaged is not None:
+            return triaged
+
+        try:
+            prompt = self._build_analysis_prompt(lead)
+
+            response_text = await self.llm.generate_async(
+                prompt=prompt,
+                system_message=self.analysis_system
+            )
+
+            return self._parse_analysis(response_text, lead)
+
+        except Exception as e:
+            return self._error_analysis(e)
+
     def generate_message(self, lead: Dict, analysis: Dict) -> Optional[str]:
         """
         Generate vibe-matched outreach message
         Only for A+ and A leads
         """
 
-        if analysis['score'] not in ['A+', 'A', 'B']:
+        if analysis['score'] not in QUALIFIED_SCORES:
             return None
 
         try:
@@ -307,120 +701,352 @@ The message should feel like it's from a peer who genuinely wants to help, not a
             # Use LLM backend (works with any configured LLM)
             outreach_message = self.llm.generate(
                 prompt=prompt,
-                system_message="You are an expert at writing personalized, vibe-matched outreach messages."
-            ).strip()
-
-            # Strip common LLM preambles (local models often add these)
-            preambles = [
-                "here is the personalized outreach message:",
-                "here is a personalized outreach message:",
-                "here's the personalized outreach message:",
-                "here's a personalized outreach message:",
-                "here is the outreach message:",
-                "sure, here is",
-                "sure! here is",
-            ]
-            lower = outreach_message.lower()
-            for p in preambles:
-                if lower.startswith(p):
-                    outreach_message = outreach_message[len(p):].strip()
-                    break
-
-            return outreach_message
-            
+                system_message=self.message_system
+            )
+
+            return self._clean_message(outreach_message)
+
         except Exception as e:
-            print(f"Error generating message: {e}")
+            log.warning("Error generating message: %s", e)
             return None
-    
+
+    async def generate_message_async(self, lead: Dict, analysis: Dict,
+                                     on_token: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Async variant of generate_message
+        Streams the reply; on_token (if given) receives text as it arrives,
+        held back only until the first PREAMBLE_WINDOW characters are checked
+        for an LLM preamble.
+        """
+
+        if analysis['score'] not in QUALIFIED_SCORES:
+            return None
+
+        try:
+            prompt = self._build_message_prompt(lead, analysis)
+
+            chunks = []
+            forwarding = False
+            async for chunk in self.llm.generate_stream(
+                prompt=prompt,
+                system_message=self.message_system,
+                max_tokens=MESSAGE_MAX_TOKENS
+            ):
+                chunks.append(chunk)
+                if on_token is None:
+                    continue
+                if forwarding:
+                    on_token(chunk)
+                elif sum(map(len, chunks)) >= PREAMBLE_WINDOW:
+                    forwarding = True
+                    on_token(self._strip_preamble(''.join(chunks)))
+
+            outreach_message = ''.join(chunks)
+            if on_token is not None and not forwarding:
+                on_token(self._strip_preamble(outreach_message))
+
+            return self._clean_message(outreach_message)
+
+        except Exception as e:
+            log.warning("Error generating message: %s", e)
+            return None
+
+    def _build_result(self, lead: Dict, analysis: Dict, message: Optional[str]) -> Dict:
+        """Assemble the per-lead result record"""
+        if analysis.get('score') == 'ERROR':
+            return {
+                'lead': lead,
+                'analysis': analysis,
+                'message': None,
+                'status': 'error'
+            }
+
+        return {
+            'lead': lead,
+            'analysis': analysis,
+            'message': message,
+            'status': 'success',
+            'processed_at': datetime.now().isoformat()
+        }
+
+    def _print_analysis(self, analysis: Dict):
+        """Print the per-lead analysis summary"""
+        log.info("   Score: %s", analysis['score'])
+        log.info("   Pain: %s", ', '.join(analysis.get('pain_points', ['None'])))
+        log.info("   Urgency: %s", analysis.get('urgency', 'Unknown'))
+
     def process_lead(self, lead: Dict) -> Dict:
         """
         Full processing pipeline for a single lead
         Returns complete analysis with message if qualified
         """
         
-        print(f"\n📊 Analyzing: {lead.get('name', 'Unknown')}")
+        log.info("\n📊 Analyzing: %s", lead.get('name', 'Unknown'))
         
         # Step 1: Analyze quality
         analysis = self.analyze_lead(lead)
         
         if analysis.get('score') == 'ERROR':
-            return {
-                'lead': lead,
-                'analysis': analysis,
-                'message': None,
-                'status': 'error'
-            }
+            return self._build_result(lead, analysis, None)
         
-        print(f"   Score: {analysis['score']}")
-        print(f"   Pain: {', '.join(analysis.get('pain_points', ['None']))}")
-        print(f"   Urgency: {analysis.get('urgency', 'Unknown')}")
+        self._print_analysis(analysis)
         
         # Step 2: Generate message if qualified
         message = None
-        if analysis['score'] in ['A+', 'A', 'B']:
-            print(f"   ✅ Qualified - Generating message...")
+        if analysis['score'] in QUALIFIED_SCORES:
+            log.info("   ✅ Qualified - Generating message...")
             message = self.generate_message(lead, analysis)
         else:
-            print(f"   ❌ Not qualified - Skipping message generation")
+            log.info("   ❌ Not qualified - Skipping message generation")
         
-        return {
-            'lead': lead,
-            'analysis': analysis,
-            'message': message,
-            'status': 'success',
-            'processed_at': datetime.now().isoformat()
-        }
+        return self._build_result(lead, analysis, message)
+
+    async def process_lead_async(self, lead: Dict,
+                                 on_token: Optional[Callable[[str], None]] = None) -> Dict:
+        """Async variant of process_lead"""
+
+        analysis = await self.analyze_lead_async(lead)
+
+        log.info("\n📊 Analyzed: %s", lead.get('name', 'Unknown'))
+
+        if analysis.get('score') == 'ERROR':
+            return self._build_result(lead, analysis, None)
+
+        self._print_analysis(analysis)
+
+        message = None
+        if analysis['score'] in QUALIFIED_SCORES:
+            message = await self.generate_message_async(lead, analysis, on_token=on_token)
+
+        return self._build_result(lead, analysis, message)
     
-    def process_batch(self, leads: List[Dict]) -> List[Dict]:
+    def process_batch(self, leads: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
         """
         Process multiple leads
-        Returns list of results
+        LLM calls are network-bound, so leads run on a thread pool sized to the
+        provider's default concurrency (override with max_workers).
+        Returns list of results in input order
         """
         
-        print(f"\n🚀 Processing {len(leads)} leads...")
-        print("=" * 60)
+        max_workers = max_workers or int(getattr(self.llm, 'concurrency', 4))
+        log.info("\n🚀 Processing %s leads (workers: %s)...", len(leads), max_workers)
+        log.info("=" * 60)
+
+        def process(lead: Dict) -> Dict:
+            result = self._load_cached_result(lead)
+            if result is None:
+                result = self.process_lead(lead)
+                self._save_cached_result(lead, result)
+            return result
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(leads)))) as pool:
+            results = list(pool.map(process, leads))
+
+        self._print_batch_summary(results)
         
+        return results
+
+    async def process_batch_async(self, leads: List[Dict], max_concurrency: int = 8,
+                                  batch_threshold: int = 100,
+                                  on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Process multiple leads concurrently
+        Up to max_concurrency LLM calls are in flight at once. Batches larger
+        than batch_threshold go through the provider's batch API when the
+        backend supports it (slower turnaround, half the cost).
+        on_result is called with each result as soon as it is ready (completion
+        order), e.g. to append it to a file while the rest are still running.
+        An authentication failure cancels the leads not yet finished.
+        Returns list of results in input order
+        """
+
+        log.info("\n🚀 Processing %s leads (concurrency: %s)...", len(leads), max_concurrency)
+        log.info("=" * 60)
+
+        results = [self._load_cached_result(lead) for lead in leads]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if len(pending) < len(leads):
+            log.info("   ♻️  %s leads served from cache", len(leads) - len(pending))
+        if on_result:
+            for result in results:
+                if result is not None:
+                    on_result(result)
+
+        def finish(i: int, result: Dict):
+            results[i] = result
+            self._save_cached_result(leads[i], result)
+            if on_result:
+                on_result(result)
+
+        if len(pending) > batch_threshold and self.llm.supports_batch:
+            fresh = await asyncio.to_thread(
+                self._process_batch_via_batch_api, [leads[i] for i in pending]
+            )
+            for i, result in zip(pending, fresh):
+                finish(i, result)
+        else:
+            semaphore = asyncio.Semaphore(max_concurrency)
+
+            async def bounded(i: int):
+                async with semaphore:
+                    return i, await self.process_lead_async(leads[i])
+
+            tasks = [asyncio.create_task(bounded(i)) for i in pending]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    i, result = await next_done
+                    finish(i, result)
+                    if result['analysis'].get('fatal'):
+                        break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            aborted = [i for i in pending if results[i] is None]
+            if aborted:
+                log.error("❌ Stopping early: LLM provider rejected the credentials, "
+                          "%s leads not processed", len(aborted))
+            for i in aborted:
+                finish(i, self._cancelled_result(leads[i]))
+
+        self._print_batch_summary(results)
+
+        return results
+
+    async def process_stream_async(self, queue: asyncio.Queue, max_concurrency: int = 8,
+                                   on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Process leads as they are put on queue, until a None sentinel
+        max_concurrency workers drain the queue, so a producer (the scrapers)
+        and the LLM calls overlap instead of running one after the other.
+        After an authentication failure the remaining leads are marked
+        cancelled without calling the provider.
+        Returns list of results in arrival order
+        """
+
+        log.info("\n🚀 Processing leads as they arrive (concurrency: %s)...", max_concurrency)
+        log.info("=" * 60)
+
         results = []
-        stats = {
-            'total': len(leads),
-            'a_plus': 0,
-            'a': 0,
-            'b': 0,
-            'c': 0,
-            'error': 0
-        }
-        
-        for lead in leads:
-            result = self.process_lead(lead)
-            results.append(result)
-            
-            # Update stats
-            score = result['analysis'].get('score', 'ERROR')
-            if score == 'A+':
-                stats['a_plus'] += 1
-            elif score == 'A':
-                stats['a'] += 1
-            elif score == 'B':
-                stats['b'] += 1
-            elif score == 'C':
-                stats['c'] += 1
-            else:
-                stats['error'] += 1
-        
-        # Print summary
-        print("\n" + "=" * 60)
-        print("📈 BATCH RESULTS:")
-        print(f"   Total processed: {stats['total']}")
-        print(f"   A+ leads: {stats['a_plus']} ({stats['a_plus']/stats['total']*100:.1f}%)")
-        print(f"   A leads: {stats['a']} ({stats['a']/stats['total']*100:.1f}%)")
-        print(f"   B leads: {stats['b']} ({stats['b']/stats['total']*100:.1f}%)")
-        print(f"   C leads: {stats['c']} ({stats['c']/stats['total']*100:.1f}%)")
-        print(f"   Errors: {stats['error']}")
-        print(f"   Messages generated: {stats['a_plus'] + stats['a']}")
-        print("=" * 60)
-        
+        cancelled = 0
+        fatal = False
+
+        async def handle(lead: Dict):
+            nonlocal fatal, cancelled
+            index = len(results)
+            results.append(None)
+            result = self._load_cached_result(lead)
+            if result is None and fatal:
+                result = self._cancelled_result(lead)
+                cancelled += 1
+            elif result is None:
+                result = await self.process_lead_async(lead)
+                self._save_cached_result(lead, result)
+                if result['analysis'].get('fatal'):
+                    fatal = True
+            results[index] = result
+            if on_result:
+                on_result(result)
+
+        async def worker():
+            while (lead := await queue.get()) is not None:
+                await handle(lead)
+            # Leave the sentinel for the next worker
+            await queue.put(None)
+
+        await asyncio.gather(*(worker() for _ in range(max(1, max_concurrency))))
+
+        if cancelled:
+            log.error("❌ Stopping early: LLM provider rejected the credentials, "
+                      "%s leads not processed", cancelled)
+
+        self._print_batch_summary(results)
+
         return results
 
+    async def aclose(self):
+        """Close the LLM clients tied to the running event loop (before it closes)"""
+        await self.llm.aclose()
+        if self.triage_llm is not None:
+            await self.triage_llm.aclose()
+
+    def _cancelled_result(self, lead: Dict) -> Dict:
+        """Result for a lead skipped because the provider rejected the credentials"""
+        return self._build_result(lead, {
+            "score": "ERROR",
+            "error": "Cancelled after an authentication failure",
+            "analyzed_at": datetime.now().isoformat()
+        }, None)
+
+    def _process_batch_via_batch_api(self, leads: List[Dict]) -> List[Dict]:
+        """
+        Analyze leads with one batch job, then generate messages for the
+        qualified ones with a second batch job
+        """
+        triaged = [None] * len(leads)
+        if self.triage_llm is not None:
+            workers = max(1, min(int(self.triage_llm.concurrency), len(leads)))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                triaged = list(pool.map(self._triage, leads))
+
+        kept = [i for i, analysis in enumerate(triaged) if analysis is None]
+        log.info("   📦 Submitting %s analyses as a batch job...", len(kept))
+        responses = self.llm.generate_batch([
+            {
+                'custom_id': str(i),
+                'prompt': self._build_analysis_prompt(leads[i]),
+                'system_message': self.analysis_system,
+            }
+            for i in kept
+        ]) if kept else {}
+
+        analyses = []
+        for i, lead in enumerate(leads):
+            if triaged[i] is not None:
+                analyses.append(triaged[i])
+                continue
+            try:
+                if str(i) not in responses:
+                    raise ValueError("Batch request did not succeed")
+                analyses.append(self._parse_analysis(responses[str(i)], lead))
+            except Exception as e:
+                analyses.append(self._error_analysis(e))
+
+        qualified = [i for i, a in enumerate(analyses) if a.get('score') in QUALIFIED_SCORES]
+        messages = {}
+        if qualified:
+            log.info("   📦 Submitting %s messages as a batch job...", len(qualified))
+            messages = self.llm.generate_batch([
+                {
+                    'custom_id': str(i),
+                    'prompt': self._build_message_prompt(leads[i], analyses[i]),
+                    'system_message': self.message_system,
+                }
+                for i in qualified
+            ])
+
+        results = []
+        for i, (lead, analysis) in enumerate(zip(leads, analyses)):
+            message = messages.get(str(i))
+            results.append(self._build_result(
+                lead, analysis, self._clean_message(message) if message else None
+            ))
+
+        return results
+
+    def _print_batch_summary(self, results: List[Dict]):
+        """Log the score distribution for a processed batch as one line"""
+        if not results:
+            return
+
+        scores = Counter(result['analysis'].get('score', 'ERROR') for result in results)
+        log.info(
+            "📈 Batch done: total=%d A+=%d A=%d B=%d C=%d errors=%d messages=%d",
+            len(results), scores['A+'], scores['A'], scores['B'], scores['C'],
+            len(results) - scores['A+'] - scores['A'] - scores['B'] - scores['C'],
+            scores['A+'] + scores['A'],
+        )
 
 if __name__ == "__main__":
     # Example usage
@@ -443,4 +1069,4 @@ if __name__ == "__main__":
     result = processor.process_lead(sample_lead)
     
     print("\n📋 RESULT:")
-    print(json.dumps(result, indent=2, default=str))
+    print(_json_dumps(result, indent=True).decode('utf-8'))
@@ -10,28 +10,182 @@ Supports multiple LLM providers:
 Usage:
     backend = get_llm_backend()  # Auto-detects from .env
     response = backend.generate(prompt, system_message)
+    response = await backend.generate_async(prompt, system_message)
+    async for chunk in backend.generate_stream(prompt, system_message):
+        ...
 """
 
 import os
+import json
+import time
+import random
+import asyncio
+import inspect
+import hashlib
+import threading
+import importlib.util
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, AsyncIterator
 
-# Load .env file if available
 try:
-    from dotenv import load_dotenv
-    load_dotenv()
+    import orjson
 except ImportError:
-    pass
+    orjson = None
+
+# Load .env file if available (VIBEMARKET_SKIP_DOTENV=1 when the env is already set)
+if not os.getenv('VIBEMARKET_SKIP_DOTENV'):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+
+def _sdk_installed(module: str, package: str) -> bool:
+    """Check a provider SDK is importable without paying its import cost"""
+    try:
+        found = importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:  # Parent package missing, e.g. google
+        found = False
+    if not found:
+        print(f"⚠️  {package} package not installed. Run: pip install {package}")
+    return found
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter for requests-per-minute and tokens-per-minute.
+
+    Paces calls below the provider ceiling instead of waiting for 429s.
+    Buckets refill continuously and are clamped down whenever the provider
+    reports fewer remaining requests/tokens in its rate-limit headers.
+    """
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _reserve(self, tokens: int) -> float:
+        """Take capacity if available; otherwise return seconds to wait"""
+        tokens = min(tokens, self.tpm)
+        with self._lock:
+            self._refill()
+            if self._requests >= 1 and self._tokens >= tokens:
+                self._requests -= 1
+                self._tokens -= tokens
+                return 0.0
+            return max(
+                (1 - self._requests) * 60 / self.rpm,
+                (tokens - self._tokens) * 60 / self.tpm,
+            )
+
+    def acquire_sync(self, tokens: int = 1):
+        """Block until a request with this many tokens may be sent"""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire(self, tokens: int = 1):
+        """Wait (without blocking the event loop) until a request may be sent"""
+        while True:
+            wait = self._reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def update_from_headers(self, headers: Dict[str, str], prefix: str = 'anthropic-ratelimit'):
+        """Clamp the buckets to what the provider says is actually left"""
+        with self._lock:
+            requests_left = headers.get(f'{prefix}-requests-remaining')
+            tokens_left = headers.get(f'{prefix}-tokens-remaining')
+            if requests_left is not None:
+                self._requests = min(self._requests, float(requests_left))
+            if tokens_left is not None:
+                self._tokens = min(self._tokens, float(tokens_left))
+
+
+# Anthropic ignores cache_control on prompts shorter than this (Sonnet/Opus)
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+def estimate_tokens(text: str, max_tokens: int = 0, system_message: Optional[str] = None) -> int:
+    """
+    Rough token count (~4 characters per token) of the prompt and system
+    message, plus the output budget. TPM limits bill all three.
+    """
+    return (len(text) + len(system_message or '')) // 4 + max_tokens
+
+
+def backoff_delay(attempt: int, base: float = 1.0) -> float:
+    """Jittered exponential backoff delay for a retry attempt (0-based)"""
+    return base * (2 ** attempt) + random.uniform(0, base)
 
 
 class LLMBackend(ABC):
     """Abstract base class for LLM backends"""
 
+    # Key into PROVIDER_LIMITS
+    provider: Optional[str] = None
+
+    # Backends that can submit many prompts as one asynchronous batch job
+    supports_batch = False
+
+    # Optional RateLimiter shared by every call through this backend
+    rate_limiter: Optional[RateLimiter] = None
+
+    # Attempts per call before a rate-limit/overload error is raised
+    max_attempts = 3
+
+    # Environment variables holding the API key (any one is enough)
+    key_env: tuple = ()
+
+    @classmethod
+    def is_configured(cls) -> bool:
+        """Cheap env-only check, run before constructing the backend"""
+        return any(os.getenv(name) for name in cls.key_env)
+
     @abstractmethod
     def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
         """Generate text from prompt"""
         pass
 
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        """
+        Generate text without blocking the event loop.
+        Default runs the sync client in a worker thread; backends with a
+        native async client override this.
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_message)
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        """
+        Yield the response in chunks as the provider produces them.
+        Default yields the whole async response at once; backends with a
+        streaming API override this.
+        """
+        yield await self.generate_async(prompt, system_message)
+
+    async def aclose(self):
+        """
+        Close clients tied to the running event loop.
+        Call before the loop closes (e.g. at the end of an asyncio.run);
+        backends without loop-bound clients have nothing to do.
+        """
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if API key is configured"""
@@ -41,119 +195,353 @@ class LLMBackend(ABC):
 class ClaudeBackend(LLMBackend):
     """Anthropic Claude backend"""
 
+    provider = 'claude'
+
+    supports_batch = True
+
+    key_env = ('ANTHROPIC_API_KEY',)
+
     def __init__(self):
         self.api_key = os.getenv('ANTHROPIC_API_KEY')
         self.model = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4-20250514')
-        self.client = None
-
-        if self.api_key:
-            try:
-                import anthropic
-                self.client = anthropic.Anthropic(api_key=self.api_key)
-            except ImportError:
-                print("⚠️  anthropic package not installed. Run: pip install anthropic")
+        self._client = None
+        self._async_client = None
+        self.available = bool(self.api_key) and _sdk_installed('anthropic', 'anthropic')
+
+    @property
+    def client(self):
+        """Sync client, created (and the SDK imported) on first use"""
+        if self._client is None:
+            import anthropic
+            # Retries are handled here with jittered backoff
+            self._client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            import anthropic
+            self._async_client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0)
+        return self._async_client
 
     def is_available(self) -> bool:
-        return self.client is not None
+        return self.available
+
+    def _request_params(self, prompt: str, system_message: Optional[str] = None,
+                        max_tokens: int = 2000) -> Dict[str, Any]:
+        """Build the Messages API parameters shared by every call style"""
+        return {
+            "model": self.model,
+            "max_tokens": max_tokens,
+            "system": [self._system_block(system_message or "You are a helpful assistant.")],
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+    @staticmethod
+    def _system_block(text: str) -> Dict[str, Any]:
+        """
+        The system prompt is the static rubric shared by every lead; marking
+        it cacheable lets later calls bill it at the cached-read rate.
+        Prompts under the provider's minimum cacheable size are sent plain,
+        which today includes both of LeadProcessor's (~670 and ~400 tokens).
+        """
+        block = {"type": "text", "text": text}
+        if estimate_tokens(text) >= PROMPT_CACHE_MIN_TOKENS:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Rate limits, overloads, 5xx and dropped connections are worth retrying"""
+        import anthropic
+        if isinstance(error, (anthropic.RateLimitError, anthropic.APIConnectionError)):
+            return True
+        return isinstance(error, anthropic.APIStatusError) and error.status_code >= 500
+
+    def _observe_headers(self, raw):
+        """Feed rate-limit headers from a raw response to the limiter"""
+        if self.rate_limiter:
+            self.rate_limiter.update_from_headers(raw.headers)
 
     def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
         if not self.is_available():
             raise ValueError("Claude API not configured. Set ANTHROPIC_API_KEY in .env")
 
-        messages = [{"role": "user", "content": prompt}]
+        params = self._request_params(prompt, system_message)
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=2000,
-            system=system_message or "You are a helpful assistant.",
-            messages=messages
-        )
+        for attempt in range(self.max_attempts):
+            if self.rate_limiter:
+                self.rate_limiter.acquire_sync(estimate_tokens(prompt, params['max_tokens'], system_message))
+            try:
+                raw = self.client.messages.with_raw_response.create(**params)
+                self._observe_headers(raw)
+                return raw.parse().content[0].text
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not self._is_retryable(e):
+                    raise
+                time.sleep(backoff_delay(attempt))
+
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        if not self.is_available():
+            raise ValueError("Claude API not configured. Set ANTHROPIC_API_KEY in .env")
+
+        params = self._request_params(prompt, system_message)
+
+        for attempt in range(self.max_attempts):
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(estimate_tokens(prompt, params['max_tokens'], system_message))
+            try:
+                raw = await self.async_client.messages.with_raw_response.create(**params)
+                self._observe_headers(raw)
+                response = raw.parse()
+                if inspect.isawaitable(response):  # newer SDKs parse asynchronously
+                    response = await response
+                return response.content[0].text
+            except Exception as e:
+                if attempt == self.max_attempts - 1 or not self._is_retryable(e):
+                    raise
+                await asyncio.sleep(backoff_delay(attempt))
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("Claude API not configured. Set ANTHROPIC_API_KEY in .env")
+
+        params = self._request_params(prompt, system_message, max_tokens)
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(prompt, max_tokens, system_message))
+
+        async with self.async_client.messages.stream(**params) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    def generate_batch(self, requests: List[Dict[str, str]], poll_interval: float = 10.0) -> Dict[str, str]:
+        """
+        Submit many prompts through the Message Batches API (50% cheaper).
 
-        return response.content[0].text
+        Args:
+            requests: List of dicts with 'custom_id', 'prompt' and optional 'system_message'
+            poll_interval: Seconds between status checks
+
+        Returns:
+            Dict of custom_id -> response text (failed requests are omitted)
+        """
+        if not self.is_available():
+            raise ValueError("Claude API not configured. Set ANTHROPIC_API_KEY in .env")
+
+        batch = self.client.messages.batches.create(requests=[
+            {
+                "custom_id": r['custom_id'],
+                "params": self._request_params(r['prompt'], r.get('system_message')),
+            }
+            for r in requests
+        ])
+
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        responses = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                responses[entry.custom_id] = entry.result.message.content[0].text
+
+        return responses
 
 
 class OpenAIBackend(LLMBackend):
     """OpenAI GPT-4 backend"""
 
+    provider = 'openai'
+
+    key_env = ('OPENAI_API_KEY',)
+
     def __init__(self):
         self.api_key = os.getenv('OPENAI_API_KEY')
         self.model = os.getenv('OPENAI_MODEL', 'gpt-4-turbo-preview')
-        self.client = None
-
-        if self.api_key:
-            try:
-                from openai import OpenAI
-                self.client = OpenAI(api_key=self.api_key)
-            except ImportError:
-                print("⚠️  openai package not installed. Run: pip install openai")
+        self._client = None
+        self._async_client = None
+        self.available = bool(self.api_key) and _sdk_installed('openai', 'openai')
+
+    @property
+    def client(self):
+        """Sync client, created (and the SDK imported) on first use"""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(api_key=self.api_key)
+        return self._client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(api_key=self.api_key)
+        return self._async_client
 
     def is_available(self) -> bool:
-        return self.client is not None
-
-    def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
-        if not self.is_available():
-            raise ValueError("OpenAI API not configured. Set OPENAI_API_KEY in .env")
+        return self.available
 
+    def _request_params(self, prompt: str, system_message: Optional[str] = None,
+                        max_tokens: int = 2000) -> Dict[str, Any]:
+        """Chat Completions parameters shared by the sync and async calls"""
         messages = []
         if system_message:
             messages.append({"role": "system", "content": system_message})
         messages.append({"role": "user", "content": prompt})
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7,
-            max_tokens=2000
-        )
+        return {
+            "model": self.model,
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        }
+
+    def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
+        if not self.is_available():
+            raise ValueError("OpenAI API not configured. Set OPENAI_API_KEY in .env")
 
+        if self.rate_limiter:
+            self.rate_limiter.acquire_sync(estimate_tokens(prompt, 2000, system_message))
+
+        response = self.client.chat.completions.create(**self._request_params(prompt, system_message))
         return response.choices[0].message.content
 
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        if not self.is_available():
+            raise ValueError("OpenAI API not configured. Set OPENAI_API_KEY in .env")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(prompt, 2000, system_message))
+
+        response = await self.async_client.chat.completions.create(**self._request_params(prompt, system_message))
+        return response.choices[0].message.content
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("OpenAI API not configured. Set OPENAI_API_KEY in .env")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(prompt, max_tokens, system_message))
+
+        stream = await self.async_client.chat.completions.create(
+            **self._request_params(prompt, system_message, max_tokens), stream=True
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# Output tokens budgeted for an uncapped Gemini call (same as the other backends' default)
+GEMINI_OUTPUT_ESTIMATE = 2000
+
 
 class GeminiBackend(LLMBackend):
     """Google Gemini backend"""
 
+    provider = 'gemini'
+
+    key_env = ('GEMINI_API_KEY', 'GOOGLE_API_KEY')
+
     def __init__(self):
         self.api_key = os.getenv('GEMINI_API_KEY') or os.getenv('GOOGLE_API_KEY')
         self.model = os.getenv('GEMINI_MODEL', 'gemini-pro')
-        self.client = None
-
-        if self.api_key:
-            try:
-                import google.generativeai as genai
-                genai.configure(api_key=self.api_key)
-                self.client = genai.GenerativeModel(self.model)
-            except ImportError:
-                print("⚠️  google-generativeai package not installed. Run: pip install google-generativeai")
+        self._client = None
+        self.available = bool(self.api_key) and _sdk_installed('google.generativeai', 'google-generativeai')
+
+    @property
+    def client(self):
+        """Model handle, created (and the SDK imported) on first use"""
+        if self._client is None:
+            import google.generativeai as genai
+            genai.configure(api_key=self.api_key)
+            self._client = genai.GenerativeModel(self.model)
+        return self._client
 
     def is_available(self) -> bool:
-        return self.client is not None
+        return self.available
 
     def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
         if not self.is_available():
             raise ValueError("Gemini API not configured. Set GEMINI_API_KEY in .env")
 
-        # Combine system message and prompt for Gemini
-        full_prompt = prompt
-        if system_message:
-            full_prompt = f"{system_message}\n\n{prompt}"
+        if self.rate_limiter:
+            self.rate_limiter.acquire_sync(estimate_tokens(prompt, GEMINI_OUTPUT_ESTIMATE, system_message))
 
-        response = self.client.generate_content(full_prompt)
+        response = self.client.generate_content(self._full_prompt(prompt, system_message))
         return response.text
 
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        if not self.is_available():
+            raise ValueError("Gemini API not configured. Set GEMINI_API_KEY in .env")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(prompt, GEMINI_OUTPUT_ESTIMATE, system_message))
+
+        response = await self.client.generate_content_async(self._full_prompt(prompt, system_message))
+        return response.text
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("Gemini API not configured. Set GEMINI_API_KEY in .env")
+
+        if self.rate_limiter:
+            await self.rate_limiter.acquire(estimate_tokens(prompt, max_tokens, system_message))
+
+        response = await self.client.generate_content_async(
+            self._full_prompt(prompt, system_message),
+            generation_config={"max_output_tokens": max_tokens},
+            stream=True,
+        )
+        async for chunk in response:
+            yield chunk.text
+
+    @staticmethod
+    def _full_prompt(prompt: str, system_message: Optional[str] = None) -> str:
+        """Combine system message and prompt for Gemini"""
+        if system_message:
+            return f"{system_message}\n\n{prompt}"
+        return prompt
+
 
 class OllamaBackend(LLMBackend):
     """Ollama (local LLM) backend"""
 
+    provider = 'ollama'
+
+    @classmethod
+    def is_configured(cls) -> bool:
+        # No key to check; only the server probe in __init__ can tell
+        return True
+
     def __init__(self):
         self.base_url = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
         self.model = os.getenv('OLLAMA_MODEL', 'llama3')
+        self._options = {
+            "temperature": 0.1,   # Low temp = more consistent JSON output
+            "num_ctx": 8192       # Large context window for lead analysis
+        }
+        self._session = None
+        self._async_http = None
+        self._async_loop = None
         self.available = self._check_availability()
 
+    def _http_session(self):
+        """Keep-alive session reused for every sync call to the Ollama server"""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10)
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
+
     def _check_availability(self) -> bool:
         """Check if Ollama is running"""
         try:
-            import requests
-            response = requests.get(f"{self.base_url}/api/tags", timeout=2)
+            response = self._http_session().get(f"{self.base_url}/api/tags", timeout=2)
             return response.status_code == 200
         except:
             return False
@@ -165,30 +553,109 @@ class OllamaBackend(LLMBackend):
         if not self.is_available():
             raise ValueError("Ollama not running. Start with: ollama serve")
 
-        import requests
+        response = self._http_session().post(
+            f"{self.base_url}/api/chat",
+            data=self._encode(self._request_body(prompt, system_message)),
+            headers=self._JSON_HEADERS,
+            timeout=120  # 2 min timeout for large prompts
+        )
+
+        return self._parse_response(response.json())
+
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        if not self.is_available():
+            raise ValueError("Ollama not running. Start with: ollama serve")
+
+        client = self._async_client()
+        if client is None:
+            return await super().generate_async(prompt, system_message)
+
+        response = await client.post(
+            "/api/chat",
+            content=self._encode(self._request_body(prompt, system_message)),
+            headers=self._JSON_HEADERS,
+        )
+        return self._parse_response(response.json())
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        if not self.is_available():
+            raise ValueError("Ollama not running. Start with: ollama serve")
 
-        # Use /api/chat for better instruction following (system/user separation)
+        client = self._async_client()
+        if client is None:
+            yield await super().generate_async(prompt, system_message)
+            return
+
+        body = self._request_body(prompt, system_message, stream=True, max_tokens=max_tokens)
+        # Streaming replies are one JSON object per line
+        async with client.stream("POST", "/api/chat", content=self._encode(body),
+                                 headers=self._JSON_HEADERS) as response:
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                data = orjson.loads(line) if orjson is not None else json.loads(line)
+                if data.get("done"):
+                    break
+                yield self._parse_response(data)
+
+    async def aclose(self):
+        """Close the pooled async client (see _async_client)"""
+        client, self._async_http, self._async_loop = self._async_http, None, None
+        if client is not None:
+            await client.aclose()
+
+    def _async_client(self):
+        """
+        One pooled httpx client per event loop, so a batch reuses its connections
+        Owners of the loop call aclose() before closing it.
+        """
+        try:
+            import httpx
+        except ImportError:
+            return None
+
+        loop = asyncio.get_running_loop()
+        if self._async_http is None or self._async_loop is not loop:
+            self._async_http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=120,
+                limits=httpx.Limits(max_connections=10, keepalive_expiry=60),
+            )
+            self._async_loop = loop
+        return self._async_http
+
+    def _request_body(self, prompt: str, system_message: Optional[str] = None,
+                      stream: bool = False, max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Use /api/chat for better instruction following (system/user separation)"""
         messages = []
         if system_message:
             messages.append({"role": "system", "content": system_message})
         messages.append({"role": "user", "content": prompt})
 
-        response = requests.post(
-            f"{self.base_url}/api/chat",
-            json={
-                "model": self.model,
-                "messages": messages,
-                "stream": False,
-                "options": {
-                    "temperature": 0.1,   # Low temp = more consistent JSON output
-                    "num_ctx": 8192       # Large context window for lead analysis
-                }
-            },
-            timeout=120  # 2 min timeout for large prompts
-        )
-
-        data = response.json()
-
+        options = self._options
+        if max_tokens:
+            options = {**options, "num_predict": max_tokens}
+
+        return {
+            "model": self.model,
+            "messages": messages,
+            "stream": stream,
+            "options": options
+        }
+
+    _JSON_HEADERS = {"Content-Type": "application/json"}
+
+    @staticmethod
+    def _encode(body: Dict[str, Any]) -> bytes:
+        """Serialize a request body once, with orjson when installed"""
+        if orjson is not None:
+            return orjson.dumps(body)
+        return json.dumps(body).encode('utf-8')
+
+    @staticmethod
+    def _parse_response(data: Dict[str, Any]) -> str:
+        """Pull the reply text out of an /api/chat response"""
         # /api/chat response format: {"message": {"content": "..."}}
         if "message" in data:
             return data["message"]["content"]
@@ -200,7 +667,268 @@ class OllamaBackend(LLMBackend):
         raise ValueError(f"Unexpected Ollama response: {list(data.keys())}")
 
 
+# Conservative defaults per provider: (requests/min, tokens/min, starting concurrency)
+PROVIDER_LIMITS = {
+    'claude': (50, 80_000, 5),
+    'openai': (60, 150_000, 10),
+    'gemini': (60, 1_000_000, 5),
+    'ollama': (1000, 10_000_000, 2),
+}
+
+
+class BackendWrapper(LLMBackend):
+    """
+    Base for backends that add behaviour around another backend.
+    Everything not overridden passes straight through to the wrapped one.
+    """
+
+    def __init__(self, backend: LLMBackend):
+        self.backend = backend
+
+    @property
+    def rate_limiter(self) -> Optional[RateLimiter]:
+        return self.backend.rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, limiter: Optional[RateLimiter]):
+        self.backend.rate_limiter = limiter
+
+    @property
+    def supports_batch(self) -> bool:
+        return self.backend.supports_batch
+
+    @property
+    def provider(self) -> Optional[str]:
+        return self.backend.provider
+
+    def __getattr__(self, name):
+        if name == 'backend':
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def is_available(self) -> bool:
+        return self.backend.is_available()
+
+    def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
+        return self.backend.generate(prompt, system_message)
+
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        return await self.backend.generate_async(prompt, system_message)
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        async for chunk in self.backend.generate_stream(prompt, system_message, max_tokens):
+            yield chunk
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+
+class RateLimitedBackend(BackendWrapper):
+    """
+    Wraps a backend with RPM/TPM pacing, retries and an AIMD concurrency limit.
+
+    The number of async calls in flight starts at the provider default, halves
+    on every rate-limit/overload error and grows by one after increase_after
+    consecutive successes (up to max_concurrency). Retries happen here rather
+    than in the wrapped backend so each 429 is seen by the controller.
+    """
+
+    def __init__(self, backend: LLMBackend, max_concurrency: Optional[int] = None,
+                 increase_after: int = 10):
+        super().__init__(backend)
+        rpm, tpm, start = PROVIDER_LIMITS.get(backend.provider, (60, 100_000, 4))
+        self.backend.max_attempts = 1
+        if self.backend.rate_limiter is None:
+            self.backend.rate_limiter = RateLimiter(rpm, tpm)
+
+        self.max_concurrency = max_concurrency or start * 2
+        self.increase_after = increase_after
+        self.concurrency = float(min(start, self.max_concurrency))
+        self._in_flight = 0
+        self._successes = 0
+        self._lock = threading.Lock()
+        self._slot_freed = None
+        self._slot_loop = None
+
+    def _is_retryable(self, error: Exception) -> bool:
+        """Use the backend's own classification when it has one"""
+        check = getattr(self.backend, '_is_retryable', None)
+        if check is not None:
+            return check(error)
+        status = getattr(error, 'status_code', None) or 0
+        return status == 429 or status >= 500 or isinstance(error, (ConnectionError, TimeoutError))
+
+    def _on_success(self):
+        with self._lock:
+            self._successes += 1
+            if self._successes >= self.increase_after:
+                self._successes = 0
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+
+    def _on_overload(self):
+        with self._lock:
+            self._successes = 0
+            self.concurrency = max(1.0, self.concurrency * 0.5)
+
+    def _slot_condition(self) -> asyncio.Condition:
+        """Condition for the running loop (asyncio primitives are loop-bound)"""
+        loop = asyncio.get_running_loop()
+        if self._slot_loop is not loop:
+            self._slot_loop = loop
+            self._slot_freed = asyncio.Condition()
+        return self._slot_freed
+
+    async def _acquire_slot(self):
+        cond = self._slot_condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < int(self.concurrency))
+            self._in_flight += 1
+
+    async def _release_slot(self):
+        # Success/overload adjust concurrency just before the release, so
+        # waking one waiter per free slot here also covers a raised limit
+        cond = self._slot_condition()
+        async with cond:
+            self._in_flight -= 1
+            cond.notify(max(0, int(self.concurrency) - self._in_flight))
+
+    def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
+        for attempt in range(self.max_attempts):
+            try:
+                text = self.backend.generate(prompt, system_message)
+            except Exception as e:
+                if not self._is_retryable(e):
+                    raise
+                self._on_overload()
+                if attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(backoff_delay(attempt))
+            else:
+                self._on_success()
+                return text
+
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        for attempt in range(self.max_attempts):
+            await self._acquire_slot()
+            try:
+                text = await self.backend.generate_async(prompt, system_message)
+            except Exception as e:
+                if not self._is_retryable(e):
+                    raise
+                self._on_overload()
+                if attempt == self.max_attempts - 1:
+                    raise
+            else:
+                self._on_success()
+                return text
+            finally:
+                await self._release_slot()
+            # Back off outside the slot so other calls can use it
+            await asyncio.sleep(backoff_delay(attempt))
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        for attempt in range(self.max_attempts):
+            started = False
+            await self._acquire_slot()
+            try:
+                async for chunk in self.backend.generate_stream(prompt, system_message, max_tokens):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if not self._is_retryable(e):
+                    raise
+                self._on_overload()
+                # Text already handed to the caller can't be taken back
+                if started or attempt == self.max_attempts - 1:
+                    raise
+            else:
+                self._on_success()
+                return
+            finally:
+                await self._release_slot()
+            await asyncio.sleep(backoff_delay(attempt))
+
+
+class CachedBackend(BackendWrapper):
+    """
+    Content-addressed response cache in front of a backend.
+
+    Responses are stored in SQLite keyed by a hash of (model, system, prompt),
+    so re-running the same prompts (overlapping scrapes, prompt iteration)
+    costs no LLM calls. Enable with LLM_CACHE=1.
+    """
+
+    def __init__(self, backend: LLMBackend, path: str = "data/llm_cache.sqlite3"):
+        super().__init__(backend)
+        import sqlite3
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, model TEXT, created_at REAL, text TEXT)"
+        )
+        self._db.commit()
+        self._db_lock = threading.Lock()
+
+    def _key(self, prompt: str, system_message: Optional[str], *extra) -> str:
+        parts = [str(getattr(self.backend, 'model', '')), system_message or '', prompt, *map(str, extra)]
+        return hashlib.blake2b('\0'.join(parts).encode('utf-8'), digest_size=16).hexdigest()
+
+    def _get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            row = self._db.execute("SELECT text FROM responses WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _put(self, key: str, text: str):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, created_at, text) VALUES (?, ?, ?, ?)",
+                (key, str(getattr(self.backend, 'model', '')), time.time(), text)
+            )
+            self._db.commit()
+
+    def generate(self, prompt: str, system_message: Optional[str] = None) -> str:
+        key = self._key(prompt, system_message)
+        text = self._get(key)
+        if text is None:
+            text = self.backend.generate(prompt, system_message)
+            self._put(key, text)
+        return text
+
+    async def generate_async(self, prompt: str, system_message: Optional[str] = None) -> str:
+        key = self._key(prompt, system_message)
+        text = self._get(key)
+        if text is None:
+            text = await self.backend.generate_async(prompt, system_message)
+            self._put(key, text)
+        return text
+
+    async def generate_stream(self, prompt: str, system_message: Optional[str] = None,
+                              max_tokens: int = 2000) -> AsyncIterator[str]:
+        key = self._key(prompt, system_message, max_tokens)
+        text = self._get(key)
+        if text is not None:
+            yield text
+            return
+
+        chunks = []
+        async for chunk in self.backend.generate_stream(prompt, system_message, max_tokens):
+            chunks.append(chunk)
+            yield chunk
+        self._put(key, ''.join(chunks))
+
+
 # Factory function to get the right backend
+BACKENDS = {
+    'claude': ClaudeBackend,
+    'openai': OpenAIBackend,
+    'gemini': GeminiBackend,
+    'ollama': OllamaBackend,
+}
+
+
 def get_llm_backend(provider: Optional[str] = None) -> LLMBackend:
     """
     Get LLM backend based on environment configuration.
@@ -219,20 +947,9 @@ def get_llm_backend(provider: Optional[str] = None) -> LLMBackend:
     # If provider specified, use it
     if provider:
         provider = provider.lower()
-        if provider == 'claude':
-            backend = ClaudeBackend()
-            if backend.is_available():
-                return backend
-        elif provider == 'openai':
-            backend = OpenAIBackend()
-            if backend.is_available():
-                return backend
-        elif provider == 'gemini':
-            backend = GeminiBackend()
-            if backend.is_available():
-                return backend
-        elif provider == 'ollama':
-            backend = OllamaBackend()
+        backend_cls = BACKENDS.get(provider)
+        if backend_cls and backend_cls.is_configured():
+            backend = backend_cls()
             if backend.is_available():
                 return backend
 
@@ -243,15 +960,18 @@ def get_llm_backend(provider: Optional[str] = None) -> LLMBackend:
     if llm_provider:
         return get_llm_backend(llm_provider)
 
-    # Try each backend in order of preference
+    # Try each backend in order of preference, constructing only configured ones
     backends = [
-        ('Claude (Anthropic)', ClaudeBackend()),
-        ('OpenAI GPT-4', OpenAIBackend()),
-        ('Google Gemini', GeminiBackend()),
-        ('Ollama (Local)', OllamaBackend()),
+        ('Claude (Anthropic)', ClaudeBackend),
+        ('OpenAI GPT-4', OpenAIBackend),
+        ('Google Gemini', GeminiBackend),
+        ('Ollama (Local)', OllamaBackend),
     ]
 
-    for name, backend in backends:
+    for name, backend_cls in backends:
+        if not backend_cls.is_configured():
+            continue
+        backend = backend_cls()
         if backend.is_available():
             print(f"✅ Using {name}")
             return backend
@@ -267,12 +987,10 @@ def get_llm_backend(provider: Optional[str] = None) -> LLMBackend:
 
 
 def list_available_backends() -> Dict[str, bool]:
-    """List all available LLM backends"""
+    """List all available LLM backends (no SDK is imported to find out)"""
     return {
-        'claude': ClaudeBackend().is_available(),
-        'openai': OpenAIBackend().is_available(),
-        'gemini': GeminiBackend().is_available(),
-        'ollama': OllamaBackend().is_available(),
+        name: backend_cls.is_configured() and backend_cls().is_available()
+        for name, backend_cls in BACKENDS.items()
     }
 
 
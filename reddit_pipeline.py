@@ -1,9 +1,13 @@
 import os
 import sys
+from log_setup import setup_logging
 from scrapers.reddit_scraper import RedditScraper
-from processors.claude_processor import LeadProcessor
+from processors.claude_processor import LeadProcessor, QUALIFIED_SCORES
 from storage.storage import LeadStorage
 
+# The processor reports per-lead progress through logging
+log = setup_logging()
+
 def main():
     print("=" * 80)
     print("🤖 REDDIT LEAD GENERATION PIPELINE")
@@ -39,7 +43,7 @@ def main():
         
         storage.save_processed_results(results)
         
-        qualified = [r for r in results if r['analysis'].get('score') in ['A+', 'A', 'B']]
+        qualified = [r for r in results if r['analysis'].get('score') in QUALIFIED_SCORES]
         
         if qualified:
             storage.save_qualified_leads(results)
@@ -5,8 +5,9 @@ Defines the interface for all lead scrapers
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 import time
+import uuid
 import random
 
 
@@ -40,6 +41,14 @@ class BaseScraper(ABC):
         """
         pass
 
+    def iter_posts(self, query: str, limit: int = 50, **filters) -> Iterator[Dict]:
+        """
+        Yield leads one at a time as they are found.
+        Scrapers that extract incrementally override this; the default
+        just walks the search_posts() result.
+        """
+        yield from self.search_posts(query, limit, **filters)
+
     @abstractmethod
     def enrich_lead(self, lead: Dict) -> Dict:
         """
@@ -53,6 +62,11 @@ class BaseScraper(ABC):
         """
         pass
 
+    @staticmethod
+    def new_lead_id(source: str) -> str:
+        """Unique lead ID like reddit_3f9c2a7b1e04, safe across scrapers and processes"""
+        return f"{source}_{uuid.uuid4().hex[:12]}"
+
     def human_delay(self, min_seconds: float = 3.0, max_seconds: float = 8.0):
         """
         Random delay to mimic human behavior
@@ -19,27 +19,243 @@ Recommended Usage:
 
 import os
 import re
-from typing import List, Dict, Optional
-from datetime import datetime
+import time
+import functools
+from typing import List, Dict, Optional, Iterator
+from datetime import date
 from scrapers.base_scraper import BaseScraper
+from scrapers.rate_limit import domain_limiter
+
+
+POST_SELECTOR = '.feed-shared-update-v2'
+
+# Runs in the page: reads name/title/content/url of up to `limit` posts in a
+# single round-trip instead of one query_selector call per field per post
+_EXTRACT_POSTS_JS = """
+(limit) => Array.from(document.querySelectorAll('.feed-shared-update-v2'))
+    .slice(0, limit)
+    .map(post => {
+        const text = (selector) => post.querySelector(selector)?.innerText?.trim() || '';
+        return {
+            name: text('.feed-shared-actor__name'),
+            title: text('.feed-shared-actor__description'),
+            content: text('.feed-shared-text'),
+            // The author's profile, not the post
+            url: post.querySelector('.feed-shared-actor__container-link')?.href || '',
+            // Activity URN (urn:li:activity:...) identifying the post itself
+            urn: (post.closest('[data-urn]') || post.querySelector('[data-urn]'))?.getAttribute('data-urn') || '',
+        };
+    })
+"""
+
+
+FEED_URL = 'https://www.linkedin.com/feed/'
+LOGIN_URL = 'https://www.linkedin.com/login'
+
+# Hides the webdriver flag from LinkedIn's bot checks; added to every tab
+_STEALTH_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+"""
+
+# Requests the scraper never needs: the feed is read from DOM text only.
+# Stylesheets stay, because infinite scroll depends on the laid-out page height.
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+
+
+def _block_assets(route):
+    """Route handler that drops images, video and fonts"""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+# Saved cookies older than this are ignored (LinkedIn rotates sessions)
+STORAGE_STATE_MAX_AGE = 24 * 3600
+
+
+# "Title at Company" / "Title @ Company"; only the first company is kept
+_TITLE_RE = re.compile(r'^(.*?) (?:at|@) (.*?)(?= (?:at|@) |$)')
+
+
+@functools.lru_cache(maxsize=2048)
+def _split_title(title: str):
+    """(title, company) from a headline; the same people show up across searches"""
+    m = _TITLE_RE.match(title)
+    if not m:
+        return title, 'Unknown'
+    return m.group(1).strip(), m.group(2).strip()
 
 
 class LinkedInScraper(BaseScraper):
     """LinkedIn scraper using Playwright for stealth"""
 
-    def __init__(self, headless: bool = False):
+    def __init__(self, headless: bool = False, user_data_dir: Optional[str] = '.chrome-profile',
+                 browser_endpoint: Optional[str] = None,
+                 storage_state_path: Optional[str] = 'data/linkedin_state.json',
+                 cdp_endpoint: Optional[str] = None, block_assets: bool = True):
         """
         Initialize LinkedIn scraper
 
         Args:
             headless: Run browser in headless mode (default: False for better stealth)
+            user_data_dir: Browser profile directory kept between runs so the
+                          LinkedIn session survives (None = fresh profile each run)
+            browser_endpoint: WebSocket URL of an already-running Playwright browser
+                             server (e.g. Browserless). Skips launching Chrome locally.
+            storage_state_path: Where cookies are saved after a login and loaded into
+                               fresh contexts (remote browser or no profile dir), so
+                               later runs skip the login form (None disables)
+            cdp_endpoint: DevTools URL of a Chrome you keep running yourself
+                         (chrome --remote-debugging-port=9222 -> http://localhost:9222).
+                         Its existing, logged-in context is reused; nothing is launched.
+            block_assets: Abort image, video and font requests in the scraper's tabs
+                         (posts are read from the DOM text; disable to debug visually)
         """
         super().__init__()
         self.headless = headless
+        self.user_data_dir = user_data_dir
+        self.browser_endpoint = browser_endpoint
+        self.storage_state_path = storage_state_path
+        self.cdp_endpoint = cdp_endpoint
+        self.block_assets = block_assets
+        self.playwright = None
         self.browser = None
+        self.context = None
         self.page = None
         self.logged_in = False
 
+    def _start_browser(self):
+        """Launch the browser and open a page (no-op if already running)"""
+        if self.page:
+            return
+
+        from playwright.sync_api import sync_playwright
+
+        self.playwright = sync_playwright().start()
+
+        # Stealth launch flags
+        args = [
+            '--disable-blink-features=AutomationControlled',
+            '--disable-dev-shm-usage',
+            '--no-sandbox',
+        ]
+        if self.headless:
+            # Nothing is displayed, so skip GPU compositing and image decoding
+            args += ['--disable-gpu', '--blink-settings=imagesEnabled=false']
+
+        # Realistic browser fingerprint
+        context_options = {
+            'viewport': {'width': 1920, 'height': 1080},
+            'user_agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'locale': 'en-US',
+            'timezone_id': 'America/New_York',
+        }
+
+        # Fresh contexts start from the cookies saved by the last login
+        saved_state = self._saved_storage_state()
+        if saved_state and (self.browser_endpoint or not self.user_data_dir):
+            context_options['storage_state'] = saved_state
+
+        if self.cdp_endpoint:
+            # Attach to the user's own warm Chrome and work in its default profile,
+            # in a new tab that close() removes again
+            self.browser = self.playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+            self.context = (self.browser.contexts[0] if self.browser.contexts
+                            else self.browser.new_context(**context_options))
+            self.page = self.context.new_page()
+        elif self.browser_endpoint:
+            # Remote browser stays warm between runs; a crash there can't take us down
+            self.browser = self.playwright.chromium.connect(self.browser_endpoint)
+            self.context = self.browser.new_context(**context_options)
+            self.page = self.context.new_page()
+        elif self.user_data_dir:
+            # Persistent profile keeps cookies, so later runs skip the login form
+            self.context = self.playwright.chromium.launch_persistent_context(
+                self.user_data_dir,
+                headless=self.headless,
+                args=args,
+                **context_options
+            )
+            self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        else:
+            self.browser = self.playwright.chromium.launch(headless=self.headless, args=args)
+            self.context = self.browser.new_context(**context_options)
+            self.page = self.context.new_page()
+
+        self._prepare_page(self.page)
+
+    def _prepare_page(self, page):
+        """Stealth script, plus asset blocking, for a tab the scraper drives"""
+        page.add_init_script(_STEALTH_JS)
+        if self.block_assets:
+            # Per page rather than per context, so a CDP-attached Chrome's
+            # other tabs are left alone
+            page.route("**/*", _block_assets)
+
+    def _saved_storage_state(self) -> Optional[str]:
+        """Path of a recent enough storage state file, if there is one"""
+        path = self.storage_state_path
+        if not path or not os.path.exists(path):
+            return None
+        if time.time() - os.path.getmtime(path) > STORAGE_STATE_MAX_AGE:
+            return None
+        return path
+
+    def _save_storage_state(self):
+        """Keep the session cookies for the next run (persistent profiles keep their own)"""
+        if not self.storage_state_path or self.cdp_endpoint:
+            return
+        if self.user_data_dir and not self.browser_endpoint:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.storage_state_path) or '.', exist_ok=True)
+            self.context.storage_state(path=self.storage_state_path)
+        except Exception as e:
+            print(f"⚠️  Could not save LinkedIn session: {e}")
+
+    @staticmethod
+    def _wait_for_posts(page, timeout: int = 10000):
+        """Wait until at least one post is in the DOM (an empty result just times out)"""
+        try:
+            page.wait_for_selector(POST_SELECTOR, state='attached', timeout=timeout)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _search_url(query: str) -> str:
+        """Content search (posts filter) for a query"""
+        return f"https://www.linkedin.com/search/results/content/?keywords={query.replace(' ', '%20')}"
+
+    def is_logged_in(self) -> bool:
+        """
+        Check whether the browser profile already has a LinkedIn session
+
+        Returns:
+            True if the feed loads with the global nav (no login needed)
+        """
+        try:
+            self._start_browser()
+            domain_limiter.wait(FEED_URL)
+            self.page.goto(FEED_URL, timeout=30000)
+            self.human_delay(2, 4)
+
+            if 'feed' in self.page.url and self.page.query_selector('#global-nav'):
+                print("✅ Reusing saved LinkedIn session")
+                self.logged_in = True
+                self._save_storage_state()
+                return True
+            return False
+
+        except ImportError:
+            print("❌ Playwright not installed. Run: pip install playwright && playwright install chromium")
+            return False
+        except Exception as e:
+            print(f"⚠️  Could not check LinkedIn session: {e}")
+            return False
+
     def login(self, email: str, password: str) -> bool:
         """
         Login to LinkedIn
@@ -52,39 +268,11 @@ class LinkedInScraper(BaseScraper):
             True if login successful
         """
         try:
-            from playwright.sync_api import sync_playwright
-
-            self.playwright = sync_playwright().start()
-
-            # Launch browser with stealth settings
-            self.browser = self.playwright.chromium.launch(
-                headless=self.headless,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                ]
-            )
-
-            # Create context with realistic user agent
-            self.context = self.browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                locale='en-US',
-                timezone_id='America/New_York',
-            )
-
-            self.page = self.context.new_page()
-
-            # Add stealth scripts
-            self.page.add_init_script("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined
-                });
-            """)
+            self._start_browser()
 
             print("🔐 Logging into LinkedIn...")
-            self.page.goto('https://www.linkedin.com/login', timeout=30000)
+            domain_limiter.wait(LOGIN_URL)
+            self.page.goto(LOGIN_URL, timeout=30000)
             self.human_delay(2, 4)
 
             # Fill login form
@@ -101,6 +289,7 @@ class LinkedInScraper(BaseScraper):
             if 'feed' in self.page.url or 'checkpoint' in self.page.url:
                 print("✅ Login successful!")
                 self.logged_in = True
+                self._save_storage_state()
                 return True
             else:
                 print("❌ Login failed - check credentials")
@@ -125,6 +314,20 @@ class LinkedInScraper(BaseScraper):
         Returns:
             List of lead dicts
         """
+        return list(self.iter_posts(query, limit, **filters))
+
+    def iter_posts(self, query: str, limit: int = 50, **filters) -> Iterator[Dict]:
+        """
+        Search LinkedIn posts for keywords, yielding each lead as it is extracted
+
+        Args:
+            query: Search query (e.g., "order management chaos")
+            limit: Max posts to scrape (default: 50)
+            **filters: Optional filters (not implemented yet)
+
+        Yields:
+            Lead dicts
+        """
         if not self.logged_in:
             raise ValueError("Must login first. Call login() before searching.")
 
@@ -135,7 +338,8 @@ class LinkedInScraper(BaseScraper):
 
         try:
             # Navigate to search (posts filter)
-            search_url = f"https://www.linkedin.com/search/results/content/?keywords={query.replace(' ', '%20')}"
+            search_url = self._search_url(query)
+            domain_limiter.wait(search_url)
             self.page.goto(search_url, timeout=30000)
             self.human_delay(4, 7)
 
@@ -146,19 +350,19 @@ class LinkedInScraper(BaseScraper):
                 self.human_delay(2, 4)
                 print(f"   📜 Scrolling... ({i+1}/{scroll_count})")
 
-            # Extract posts
-            posts = self.page.query_selector_all('.feed-shared-update-v2')
+            # Extract every post's fields in one in-page call, once the feed has rendered
+            self._wait_for_posts(self.page)
+            posts = self.page.evaluate(_EXTRACT_POSTS_JS, limit)
             print(f"   Found {len(posts)} posts on page")
 
-            for idx, post in enumerate(posts[:limit]):
+            for idx, post in enumerate(posts):
                 try:
-                    # Extract post data
+                    # Build lead from extracted fields
                     lead = self._extract_post_data(post)
                     if lead:
                         leads.append(lead)
                         print(f"   ✅ Lead {len(leads)}: {lead['name']} - {lead['company']}")
-
-                    self.human_delay(1, 3)
+                        yield lead
 
                 except Exception as e:
                     print(f"   ⚠️  Error extracting post {idx}: {e}")
@@ -168,61 +372,45 @@ class LinkedInScraper(BaseScraper):
                     break
 
             print(f"\n✅ Scraped {len(leads)} leads")
-            self.leads_found = leads
-            return leads
 
         except Exception as e:
             print(f"❌ Search error: {e}")
-            return leads
 
-    def _extract_post_data(self, post_element) -> Optional[Dict]:
+        finally:
+            self.leads_found = leads
+
+    def _extract_post_data(self, post: Dict) -> Optional[Dict]:
         """
-        Extract lead data from a post element
+        Build lead data from the fields extracted for one post
 
         Returns:
             Lead dict or None if extraction fails
         """
         try:
-            # Name
-            name_elem = post_element.query_selector('.feed-shared-actor__name')
-            name = name_elem.inner_text().strip() if name_elem else 'Unknown'
-
-            # Title
-            title_elem = post_element.query_selector('.feed-shared-actor__description')
-            title = title_elem.inner_text().strip() if title_elem else 'Unknown'
+            name = post.get('name') or 'Unknown'
+            title = post.get('title') or 'Unknown'
 
             # Extract company from title (often in format "Title at Company")
-            company = 'Unknown'
-            if ' at ' in title:
-                parts = title.split(' at ')
-                title = parts[0].strip()
-                company = parts[1].strip()
-            elif ' @ ' in title:
-                parts = title.split(' @ ')
-                title = parts[0].strip()
-                company = parts[1].strip()
-
-            # Post content
-            content_elem = post_element.query_selector('.feed-shared-text')
-            content = content_elem.inner_text().strip() if content_elem else ''
-
-            # Post URL
-            link_elem = post_element.query_selector('.feed-shared-actor__container-link')
-            profile_url = link_elem.get_attribute('href') if link_elem else ''
+            title, company = _split_title(title)
+
+            content = post.get('content') or ''
+            profile_url = post.get('url') or ''
+            urn = post.get('urn') or ''
 
             # Only include posts with actual content
             if not content or len(content) < 50:
                 return None
 
             return {
-                'id': f"linkedin_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.leads_found)}",
+                'id': self.new_lead_id('linkedin'),
                 'name': name,
                 'title': title,
                 'company': company,
                 'source': 'LinkedIn',
-                'date': datetime.now().strftime('%Y-%m-%d'),
+                'date': date.today().isoformat(),
                 'content': content,
                 'url': profile_url,
+                'post_url': f"https://www.linkedin.com/feed/update/{urn}/" if urn else '',
             }
 
         except Exception as e:
@@ -252,11 +440,12 @@ class LinkedInScraper(BaseScraper):
         """Close browser and cleanup"""
         if self.page:
             self.page.close()
-        if self.context:
+        # The default context of a CDP-attached Chrome belongs to the user
+        if self.context and not (self.cdp_endpoint and self.context in self.browser.contexts[:1]):
             self.context.close()
         if self.browser:
             self.browser.close()
-        if hasattr(self, 'playwright'):
+        if self.playwright:
             self.playwright.stop()
 
         print("🔒 Browser closed")
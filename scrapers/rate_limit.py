@@ -0,0 +1,73 @@
+"""
+Per-domain request pacing shared by every scraper
+
+Each domain gets a random gap between min_delay and max_delay seconds
+between requests, however many threads are scraping it. Slots are
+reserved under a lock and slept outside it, so one slow wait doesn't hold
+up the other domains.
+
+Override the defaults with SCRAPER_RATE_LIMITS_JSON, e.g.
+    {"reddit.com": [1, 3], "linkedin.com": [2, 5]}
+"""
+
+import os
+import json
+import time
+import random
+import threading
+import urllib.parse
+from typing import Dict, Tuple
+
+# (min_delay, max_delay) seconds between requests to a domain
+DEFAULT_DELAYS: Dict[str, Tuple[float, float]] = {
+    'reddit.com': (1.0, 3.0),
+    'linkedin.com': (2.0, 4.0),
+}
+
+
+class DomainLimiter:
+    """Spaces out requests per domain with randomized min/max delays"""
+
+    def __init__(self, delays: Dict[str, Tuple[float, float]]):
+        self.delays = dict(delays)
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'DomainLimiter':
+        """Defaults, overridden per domain by SCRAPER_RATE_LIMITS_JSON"""
+        delays = dict(DEFAULT_DELAYS)
+        raw = os.getenv('SCRAPER_RATE_LIMITS_JSON')
+        if raw:
+            try:
+                for domain, (low, high) in json.loads(raw).items():
+                    delays[domain] = (float(low), float(high))
+            except (ValueError, TypeError) as e:
+                print(f"⚠️  Ignoring SCRAPER_RATE_LIMITS_JSON: {e}")
+        return cls(delays)
+
+    @staticmethod
+    def domain(url: str) -> str:
+        """reddit.com for https://www.reddit.com/..., bare domains pass through"""
+        host = urllib.parse.urlsplit(url).hostname or url
+        return host[4:] if host.startswith('www.') else host
+
+    def _reserve(self, url: str) -> float:
+        """Claim the next free slot for the URL's domain; returns seconds to wait"""
+        domain = self.domain(url)
+        low, high = self.delays.get(domain, (0.0, 0.0))
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, now))
+            self._next_slot[domain] = slot + random.uniform(low, high)
+        return slot - now
+
+    def wait(self, url: str):
+        """Block until a request to this URL's domain is allowed"""
+        delay = self._reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+
+# One schedule per process, shared by every scraper instance
+domain_limiter = DomainLimiter.from_env()
@@ -1,11 +1,26 @@
 import requests
 import urllib.parse
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable, Tuple
 from datetime import datetime
 from scrapers.base_scraper import BaseScraper
+from scrapers.rate_limit import domain_limiter
 import time
 import random
 
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+REDDIT_URL = "https://www.reddit.com/"
+
+# Reddit returns at most PAGE_SIZE posts per request, so the first page asks
+# for min(limit, PAGE_SIZE) and later pages for the maximum; MAX_PAGES bounds
+# a search that keeps turning up filtered-out posts
+PAGE_SIZE = 100
+MAX_PAGES = 5
+
+
 class RedditScraper(BaseScraper):
     """Reddit scraper using public search JSON API"""
 
@@ -37,48 +52,88 @@ class RedditScraper(BaseScraper):
         print(f"   Target: {limit} leads")
 
         leads = []
-        encoded_query = urllib.parse.quote(query)
-        
-        # We can search specific subs or globally. For this we will search globally.
-        url = f"https://www.reddit.com/search.json?q={encoded_query}&sort=new&limit={limit}"
+        after = None
+        page_size = min(limit, PAGE_SIZE)
 
         try:
-            self.human_delay(1, 3) # Be polite
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code != 200:
-                print(f"❌ Reddit API returned status {response.status_code}")
-                return leads
+            for _page in range(MAX_PAGES):
+                url = self._search_url(query, page_size, after)
+                domain_limiter.wait(url) # Be polite
+                # Streamed so ijson can parse posts as they arrive
+                response = self.session.get(url, timeout=15, stream=ijson is not None)
+                
+                if response.status_code != 200:
+                    print(f"❌ Reddit API returned status {response.status_code}")
+                    response.close()
+                    break
+
+                with response:
+                    read, after = self._parse_results(self._iter_children(response), limit, leads)
+
+                # Short page or no cursor: nothing more to fetch
+                if len(leads) >= limit or read < page_size or not after:
+                    break
+                page_size = PAGE_SIZE
 
-            data = response.json()
-            
-            # Navigate Reddit's JSON structure
-            posts = data.get('data', {}).get('children', [])
-            print(f"   Found {len(posts)} posts in search results")
-
-            for idx, post_wrapper in enumerate(posts[:limit]):
-                try:
-                    post_data = post_wrapper.get('data', {})
-                    lead = self._extract_post_data(post_data)
-                    
-                    if lead:
-                        leads.append(lead)
-                        print(f"   ✅ Lead {len(leads)}: u/{lead['name']} - r/{post_data.get('subreddit', 'Unknown')}")
-                        
-                    if len(leads) >= limit:
-                        break
+        except Exception as e:
+            print(f"❌ Reddit Search error: {e}")
+
+        print(f"\n✅ Scraped {len(leads)} leads from Reddit")
+        return leads
 
-                except Exception as e:
-                    print(f"   ⚠️  Error extracting post {idx}: {e}")
-                    continue
+    @staticmethod
+    def _search_url(query: str, limit: int, after: Optional[str] = None) -> str:
+        """Global search, newest first, continuing after a post fullname if given"""
+        # We can search specific subs or globally. For this we will search globally.
+        url = f"{REDDIT_URL}search.json?q={urllib.parse.quote(query)}&sort=new&limit={limit}"
+        return f"{url}&after={after}" if after else url
 
-            print(f"\n✅ Scraped {len(leads)} leads from Reddit")
-            self.leads_found.extend(leads)
-            return leads
+    @staticmethod
+    def _listing_children(data: dict) -> List[Dict]:
+        """Navigate Reddit's JSON structure to the post wrappers"""
+        return data.get('data', {}).get('children', [])
 
-        except Exception as e:
-            print(f"❌ Reddit Search error: {e}")
-            return leads
+    def _iter_children(self, response) -> Iterable[Dict]:
+        """
+        Post wrappers from a search response
+        With ijson the body is parsed one post at a time, so the whole
+        listing is never held as Python objects at once
+        """
+        if ijson is None:
+            return self._listing_children(response.json())
+        response.raw.decode_content = True  # Undo gzip before parsing
+        return ijson.items(response.raw, 'data.children.item', use_float=True)
+
+    def _parse_results(self, posts: Iterable[Dict], limit: int,
+                       leads: List[Dict]) -> Tuple[int, Optional[str]]:
+        """
+        Add leads from one page of a search.json listing until there are limit
+        Returns how many posts were read and the fullname of the last one,
+        which is the cursor for the next page
+        """
+        idx = -1
+        last_name = None
+
+        for idx, post_wrapper in enumerate(posts):
+            try:
+                post_data = post_wrapper.get('data', {})
+                last_name = post_data.get('name')
+                lead = self._extract_post_data(post_data)
+                
+                if lead:
+                    leads.append(lead)
+                    self.leads_found.append(lead)
+                    print(f"   ✅ Lead {len(leads)}: u/{lead['name']} - r/{post_data.get('subreddit', 'Unknown')}")
+                    
+                if len(leads) >= limit:
+                    break
+
+            except Exception as e:
+                print(f"   ⚠️  Error extracting post {idx}: {e}")
+                continue
+
+        print(f"   Read {idx + 1} posts from search results")
+        return idx + 1, last_name
 
     def _extract_post_data(self, post_data: dict) -> Optional[Dict]:
         """
@@ -105,7 +160,7 @@ class RedditScraper(BaseScraper):
             profile_url = f"https://www.reddit.com{permalink}"
 
             return {
-                'id': f"reddit_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(self.leads_found)}",
+                'id': self.new_lead_id('reddit'),
                 'name': author,
                 'title': f"Author on r/{subreddit}",
                 'company': 'Unknown (Reddit)',
@@ -0,0 +1,71 @@
+"""
+Small in-process TTL cache for values computed from the database.
+
+Used for the dashboard numbers, the leads list's total count and the
+rendered list and detail pages: every page load and htmx poll would
+otherwise re-run the same queries. Write paths in storage.database call
+clear(); writes from another process (e.g. auto_pipeline) show up once the
+entry expires.
+"""
+
+import os
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class TTLCache:
+    """Thread-safe key -> value cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl: float = 30.0, maxsize: int = 16):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Cached value for key if it hasn't expired, else default (never computes)"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return default
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, or compute() it (outside the lock) and store it"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # A clear() while computing means the value may predate a write
+            if generation == self._generation and self.ttl > 0:
+                if len(self._entries) >= self.maxsize:
+                    self._entries.clear()
+                self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def clear(self):
+        """Drop every entry (call after a write the cached values depend on)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+
+# Dashboard stats and funnel, keyed by the look-back window (DASHBOARD_CACHE_TTL=0 disables)
+dashboard_cache = TTLCache(ttl=float(os.getenv('DASHBOARD_CACHE_TTL', '30')))
+
+# Leads list totals, keyed by the filter set (LEAD_COUNT_CACHE_TTL=0 disables)
+lead_count_cache = TTLCache(ttl=float(os.getenv('LEAD_COUNT_CACHE_TTL', '60')), maxsize=64)
+
+# Rendered leads list pages, keyed by page and filters (LEADS_PAGE_CACHE_TTL=0 disables)
+leads_page_cache = TTLCache(ttl=float(os.getenv('LEADS_PAGE_CACHE_TTL', '45')), maxsize=64)
+
+# Rendered lead detail pages with their ETags, keyed by lead ID (LEAD_DETAIL_CACHE_TTL=0 disables)
+lead_detail_cache = TTLCache(ttl=float(os.getenv('LEAD_DETAIL_CACHE_TTL', '60')), maxsize=64)
@@ -6,14 +6,19 @@ Keeps things simple for personal use while maintaining good practices.
 """
 
 import os
+import base64
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from contextlib import contextmanager
-from sqlalchemy import func, desc, and_, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import func, desc, and_, or_, insert, update, delete, select, case, literal, bindparam, text, column, tuple_, DateTime
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload, load_only
 
+from storage.cache import dashboard_cache, lead_count_cache, leads_page_cache, lead_detail_cache
 from storage.models import (
     init_db,
+    utcnow,
+    has_search_index,
     Lead,
     LeadStatusHistory,
     EmailSend,
@@ -25,15 +30,17 @@ from storage.models import (
 # Global session factory (initialized on first use)
 _SessionLocal = None
 _engine = None
+_search_index = False
 
 
 def get_session_factory():
     """Get or create session factory"""
-    global _SessionLocal, _engine
+    global _SessionLocal, _engine, _search_index
     if _SessionLocal is None:
         # Ensure data directory exists
         os.makedirs('data', exist_ok=True)
         _engine, _SessionLocal = init_db('sqlite:///data/vibe-leads.db')
+        _search_index = has_search_index(_engine)
     return _SessionLocal
 
 
@@ -58,6 +65,14 @@ def get_db():
         db.close()
 
 
+def _invalidate_caches():
+    """Drop cached values derived from the leads table (call after every lead write)"""
+    dashboard_cache.clear()
+    lead_count_cache.clear()
+    leads_page_cache.clear()
+    lead_detail_cache.clear()
+
+
 # ============================================================================
 # LEAD OPERATIONS
 # ============================================================================
@@ -75,7 +90,7 @@ def create_lead(db: Session, lead_data: Dict[str, Any]) -> Lead:
     """
     lead = Lead(**lead_data)
     db.add(lead)
-    db.flush()  # Get the ID without committing
+    db.flush()  # INSERT ... RETURNING id, without committing
 
     # Create initial status history entry
     history = LeadStatusHistory(
@@ -86,13 +101,71 @@ def create_lead(db: Session, lead_data: Dict[str, Any]) -> Lead:
     )
     db.add(history)
     db.commit()
-    db.refresh(lead)
+    _invalidate_caches()
+    # No refresh: the session doesn't expire on commit and every column
+    # default is applied in Python, so the instance is already complete
     return lead
 
 
-def get_lead_by_id(db: Session, lead_id: int) -> Optional[Lead]:
-    """Get a lead by ID"""
-    return db.query(Lead).filter(Lead.id == lead_id).first()
+def create_leads_bulk(db: Session, leads: List[Dict[str, Any]]) -> List[int]:
+    """
+    Create many leads in one transaction, e.g. a whole scrape at once.
+
+    Leads whose external_id is already stored (or repeated in the batch) are
+    skipped by INSERT ... ON CONFLICT DO NOTHING, so dedup and insert are a
+    single statement and two concurrent scrapers can't race each other.
+
+    Args:
+        db: Database session
+        leads: Dictionaries with lead information (Lead column names)
+
+    Returns:
+        IDs of the created leads
+    """
+    if not leads:
+        return []
+
+    ids = list(db.scalars(
+        sqlite_insert(Lead)
+        .on_conflict_do_nothing(index_elements=['external_id'])
+        .returning(Lead.id),
+        leads
+    ))
+    if ids:
+        db.execute(insert(LeadStatusHistory), [
+            {'lead_id': lead_id, 'old_status': None, 'new_status': 'new', 'notes': 'Lead created'}
+            for lead_id in ids
+        ])
+    db.commit()
+    _invalidate_caches()
+    return ids
+
+
+# Relationship names accepted by the `load` argument below
+EAGER_LOADS = {
+    'tags': Lead.tags,
+    'emails': Lead.email_sends,
+    'history': Lead.status_history,
+}
+
+
+def _with_loads(query, load: Optional[List[str]]):
+    """Eager-load the requested relationships with one IN query each (no N+1)"""
+    if load:
+        query = query.options(*(selectinload(EAGER_LOADS[name]) for name in load))
+    return query
+
+
+def get_lead_by_id(db: Session, lead_id: int, load: Optional[List[str]] = None) -> Optional[Lead]:
+    """Get a lead by ID, optionally eager-loading 'tags', 'emails' and/or 'history'"""
+    return _with_loads(db.query(Lead), load).filter(Lead.id == lead_id).first()
+
+
+def get_leads_by_ids(db: Session, lead_ids: List[int]) -> List[Lead]:
+    """Leads with these IDs in one IN query (missing IDs are skipped), in ID order"""
+    if not lead_ids:
+        return []
+    return db.query(Lead).filter(Lead.id.in_(lead_ids)).order_by(Lead.id).all()
 
 
 def get_lead_by_external_id(db: Session, external_id: str) -> Optional[Lead]:
@@ -100,8 +173,61 @@ def get_lead_by_external_id(db: Session, external_id: str) -> Optional[Lead]:
     return db.query(Lead).filter(Lead.external_id == external_id).first()
 
 
+def lead_exists(db: Session, external_id: str) -> bool:
+    """Check for a stored lead by external ID without loading it (duplicate checks)"""
+    return db.query(db.query(Lead.id).filter(Lead.external_id == external_id).exists()).scalar()
+
+
+def _fts_query(search: str) -> str:
+    """
+    Turn free text into an FTS5 MATCH expression: every word must appear,
+    as a prefix ("dist" matches "distributor"). Words are quoted so FTS5
+    operators and punctuation in user input are taken literally.
+    """
+    words = [word.replace('"', '""') for word in search.split()]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _apply_lead_filters(query, filters: Optional[Dict]):
+    """Apply the get_all_leads filter keys to a Lead query (shared with count_leads)"""
+    if not filters:
+        return query
+
+    if filters.get('score'):
+        query = query.filter(Lead.score == filters['score'])
+    if filters.get('status'):
+        query = query.filter(Lead.status == filters['status'])
+    if filters.get('source'):
+        query = query.filter(Lead.source == filters['source'])
+    if filters.get('search') and _search_index:
+        match = _fts_query(filters['search'])
+        if match:
+            query = query.filter(Lead.id.in_(
+                text("SELECT rowid FROM lead_fts WHERE lead_fts MATCH :match")
+                .bindparams(match=match)
+                .columns(column('rowid'))
+            ))
+    elif filters.get('search'):
+        search_term = f"%{filters['search']}%"
+        query = query.filter(
+            or_(
+                Lead.name.like(search_term),
+                Lead.company.like(search_term),
+                Lead.content.like(search_term)
+            )
+        )
+    if filters.get('date_from'):
+        query = query.filter(Lead.created_at >= filters['date_from'])
+    if filters.get('date_to'):
+        query = query.filter(Lead.created_at <= filters['date_to'])
+    return query
+
+
 def get_all_leads(db: Session, limit: int = 100, offset: int = 0,
-                  filters: Optional[Dict] = None) -> List[Lead]:
+                  filters: Optional[Dict] = None,
+                  load: Optional[List[str]] = None,
+                  columns: Optional[List[str]] = None,
+                  before: Optional[Tuple[datetime, int]] = None) -> List[Lead]:
     """
     Get leads with optional filtering.
 
@@ -116,72 +242,87 @@ def get_all_leads(db: Session, limit: int = 100, offset: int = 0,
             - search: Search in name, company, content
             - date_from: Created after this date
             - date_to: Created before this date
+        load: Relationships to eager-load ('tags', 'emails', 'history')
+        columns: Load only these Lead columns (list views skip the large
+                 analysis_raw/outreach_message/content fields)
+        before: (created_at, id) of the last lead on the previous page, from
+                decode_cursor; seeks straight to the next page instead of
+                walking past `offset` rows
 
     Returns:
         List of Lead objects
     """
-    query = db.query(Lead)
+    query = _apply_lead_filters(_with_loads(db.query(Lead), load), filters)
+    if columns:
+        query = query.options(load_only(*(getattr(Lead, name) for name in columns)))
 
-    if filters:
-        if 'score' in filters and filters['score']:
-            query = query.filter(Lead.score == filters['score'])
+    if before:
+        query = query.filter(tuple_(Lead.created_at, Lead.id) < tuple_(*before))
 
-        if 'status' in filters and filters['status']:
-            query = query.filter(Lead.status == filters['status'])
+    # Order by most recent first (id breaks ties, so pages never overlap)
+    query = query.order_by(desc(Lead.created_at), desc(Lead.id))
 
-        if 'source' in filters and filters['source']:
-            query = query.filter(Lead.source == filters['source'])
+    return query.offset(offset).limit(limit).all()
 
-        if 'search' in filters and filters['search']:
-            search_term = f"%{filters['search']}%"
-            query = query.filter(
-                or_(
-                    Lead.name.like(search_term),
-                    Lead.company.like(search_term),
-                    Lead.content.like(search_term)
-                )
-            )
 
-        if 'date_from' in filters and filters['date_from']:
-            query = query.filter(Lead.created_at >= filters['date_from'])
+def get_leads_projection(db: Session, columns: List[str], limit: int = 100, offset: int = 0,
+                         filters: Optional[Dict] = None, preview: Optional[int] = None) -> List[Any]:
+    """
+    Read-only lead rows of just these columns, newest first.
 
-        if 'date_to' in filters and filters['date_to']:
-            query = query.filter(Lead.created_at <= filters['date_to'])
+    Skips ORM instance construction and identity-map bookkeeping, for views
+    that only display leads. Rows support attribute access (lead.name).
 
-    # Order by most recent first
-    query = query.order_by(desc(Lead.created_at))
+    Args:
+        db: Database session
+        columns: Lead column names to select
+        limit: Max number of results
+        offset: Skip this many results
+        filters: Same filters as get_all_leads
+        preview: Truncate content to this many characters in SQL
 
-    return query.offset(offset).limit(limit).all()
+    Returns:
+        List of rows
+    """
+    selected = []
+    for name in columns:
+        col = getattr(Lead, name)
+        if name == 'content' and preview:
+            col = func.substr(Lead.content, 1, preview).label('content')
+        selected.append(col)
+
+    stmt = _apply_lead_filters(select(*selected), filters)
+    stmt = stmt.order_by(desc(Lead.created_at), desc(Lead.id)).offset(offset).limit(limit)
+    return db.execute(stmt).all()
+
+
+def encode_cursor(lead: Lead) -> str:
+    """Opaque keyset cursor for the page after this lead"""
+    raw = f"{lead.created_at.isoformat()}|{lead.id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    """(created_at, id) for get_all_leads(before=...), or None if malformed"""
+    try:
+        created_at, lead_id = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(lead_id)
+    except (ValueError, UnicodeError):
+        return None
 
 
 def count_leads(db: Session, filters: Optional[Dict] = None) -> int:
     """Count leads with optional filters (same filters as get_all_leads)"""
-    query = db.query(func.count(Lead.id))
-
-    if filters:
-        if 'score' in filters and filters['score']:
-            query = query.filter(Lead.score == filters['score'])
-        if 'status' in filters and filters['status']:
-            query = query.filter(Lead.status == filters['status'])
-        if 'source' in filters and filters['source']:
-            query = query.filter(Lead.source == filters['source'])
-        if 'search' in filters and filters['search']:
-            search_term = f"%{filters['search']}%"
-            query = query.filter(
-                or_(
-                    Lead.name.like(search_term),
-                    Lead.company.like(search_term),
-                    Lead.content.like(search_term)
-                )
-            )
-        if 'date_from' in filters and filters['date_from']:
-            query = query.filter(Lead.created_at >= filters['date_from'])
-        if 'date_to' in filters and filters['date_to']:
-            query = query.filter(Lead.created_at <= filters['date_to'])
-
+    query = _apply_lead_filters(db.query(func.count()).select_from(Lead), filters)
     return query.scalar()
 
 
+def count_leads_cached(db: Session, filters: Optional[Dict] = None) -> int:
+    """count_leads, reused for a minute per filter set instead of a COUNT per page view"""
+    key = tuple(sorted((name, value) for name, value in (filters or {}).items() if value))
+    return lead_count_cache.get_or_compute(key, lambda: count_leads(db, filters))
+
+
 def update_lead(db: Session, lead_id: int, update_data: Dict[str, Any]) -> Optional[Lead]:
     """Update a lead's information"""
     lead = get_lead_by_id(db, lead_id)
@@ -193,6 +334,7 @@ def update_lead(db: Session, lead_id: int, update_data: Dict[str, Any]) -> Optio
             setattr(lead, key, value)
 
     db.commit()
+    _invalidate_caches()
     db.refresh(lead)
     return lead
 
@@ -219,15 +361,15 @@ def update_lead_status(db: Session, lead_id: int, new_status: str, notes: Option
 
     # Update relevant timestamps
     if new_status == 'analyzed' and not lead.analyzed_at:
-        lead.analyzed_at = datetime.utcnow()
+        lead.analyzed_at = utcnow()
     elif new_status == 'contacted' and not lead.contacted_at:
-        lead.contacted_at = datetime.utcnow()
+        lead.contacted_at = utcnow()
     elif new_status == 'replied' and not lead.replied_at:
-        lead.replied_at = datetime.utcnow()
+        lead.replied_at = utcnow()
     elif new_status == 'won' and not lead.won_at:
-        lead.won_at = datetime.utcnow()
+        lead.won_at = utcnow()
     elif new_status == 'lost' and not lead.lost_at:
-        lead.lost_at = datetime.utcnow()
+        lead.lost_at = utcnow()
 
     # Log status change
     history = LeadStatusHistory(
@@ -239,55 +381,167 @@ def update_lead_status(db: Session, lead_id: int, new_status: str, notes: Option
     db.add(history)
 
     db.commit()
-    db.refresh(lead)
+    _invalidate_caches()
+    # Already current: the session doesn't expire on commit
     return lead
 
 
-def save_lead_analysis(db: Session, lead_id: int, analysis: Dict[str, Any], message: Optional[str] = None):
+# Timestamp column set the first time a lead reaches each status
+_STATUS_TIMESTAMPS = {
+    'analyzed': 'analyzed_at',
+    'contacted': 'contacted_at',
+    'replied': 'replied_at',
+    'won': 'won_at',
+    'lost': 'lost_at',
+}
+
+
+def update_leads_status(db: Session, lead_ids: List[int], new_status: str,
+                        notes: Optional[str] = None) -> List[int]:
+    """
+    Update several leads' status in one transaction (see update_lead_status).
+
+    One INSERT ... SELECT logs every change (reading the old statuses before
+    they are overwritten) and one UPDATE ... WHERE id IN sets the new status,
+    instead of a load, update and history insert per lead.
+
+    Returns:
+        IDs of the leads that were found and updated
+    """
+    if not lead_ids:
+        return []
+
+    now = utcnow()
+    history_notes = literal(notes) if notes else (
+        literal('Status changed from ') + func.coalesce(Lead.status, 'None') + literal(f' to {new_status}')
+    )
+    db.execute(
+        insert(LeadStatusHistory).from_select(
+            ['lead_id', 'old_status', 'new_status', 'changed_at', 'notes'],
+            select(Lead.id, Lead.status, literal(new_status), literal(now, DateTime), history_notes)
+            .where(Lead.id.in_(lead_ids))
+        )
+    )
+
+    values = {'status': new_status}
+    timestamp = _STATUS_TIMESTAMPS.get(new_status)
+    if timestamp:
+        values[timestamp] = func.coalesce(getattr(Lead, timestamp), now)
+    updated = db.execute(
+        update(Lead).where(Lead.id.in_(lead_ids)).values(**values)
+        .returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+    db.commit()
+    _invalidate_caches()
+    return updated
+
+
+def _write_lead_analysis(db: Session, lead_id: int, analysis: Dict[str, Any],
+                         message: Optional[str], now: datetime) -> Optional[int]:
+    """History row and analysis UPDATE for one lead, without committing"""
+    # Log the status change first, while the old status is still visible
+    db.execute(insert(LeadStatusHistory).from_select(
+        ['lead_id', 'old_status', 'new_status', 'changed_at', 'notes'],
+        select(
+            Lead.id, literal('new'), literal('analyzed'),
+            literal(now, DateTime), literal('Lead analyzed by Claude AI')
+        ).where(Lead.id == lead_id, Lead.status == 'new')
+    ))
+
+    return db.execute(
+        update(Lead)
+        .where(Lead.id == lead_id)
+        .values(
+            score=analysis.get('score'),
+            pain_points=analysis.get('pain_points'),
+            pain_clarity=analysis.get('pain_clarity'),
+            urgency=analysis.get('urgency'),
+            authority=analysis.get('authority'),
+            specificity_score=analysis.get('specificity_score'),
+            industry_fit=analysis.get('industry_fit'),
+            size_fit=analysis.get('size_fit'),
+            analysis_raw=analysis,
+            outreach_message=message,
+            analyzed_at=now,
+            status=case((Lead.status == 'new', 'analyzed'), else_=Lead.status),
+        )
+        .returning(Lead.id)
+        # The commit afterwards expires any loaded copy of the lead anyway
+        .execution_options(synchronize_session=False)
+    ).scalar()
+
+
+def save_lead_analysis(db: Session, lead_id: int, analysis: Dict[str, Any],
+                       message: Optional[str] = None) -> Optional[int]:
     """
     Save Claude AI analysis results to a lead.
 
+    One transaction: the new -> analyzed history row, then a single UPDATE
+    of the analysis fields and status, with no SELECT of the lead.
+
     Args:
         db: Database session
         lead_id: Lead ID
         analysis: Analysis dict from LeadProcessor
         message: Generated outreach message
+
+    Returns:
+        The lead ID, or None if not found
     """
-    lead = get_lead_by_id(db, lead_id)
-    if not lead:
+    updated = _write_lead_analysis(db, lead_id, analysis, message, utcnow())
+    if updated is None:
         return None
 
-    # Update lead with analysis
-    lead.score = analysis.get('score')
-    lead.pain_points = analysis.get('pain_points')
-    lead.pain_clarity = analysis.get('pain_clarity')
-    lead.urgency = analysis.get('urgency')
-    lead.authority = analysis.get('authority')
-    lead.specificity_score = analysis.get('specificity_score')
-    lead.industry_fit = analysis.get('industry_fit')
-    lead.size_fit = analysis.get('size_fit')
-    lead.analysis_raw = analysis
-    lead.outreach_message = message
-    lead.analyzed_at = datetime.utcnow()
-
-    # Update status to 'analyzed'
-    if lead.status == 'new':
-        update_lead_status(db, lead_id, 'analyzed', notes='Lead analyzed by Claude AI')
-    else:
-        db.commit()
+    db.commit()
+    _invalidate_caches()
+    return updated
 
-    db.refresh(lead)
-    return lead
+
+def save_lead_analyses(db: Session,
+                       results: List[Tuple[int, Dict[str, Any], Optional[str]]]) -> List[int]:
+    """
+    Save many analyses in one transaction (see save_lead_analysis).
+
+    Args:
+        db: Database session
+        results: (lead_id, analysis, message) per lead
+
+    Returns:
+        IDs of the leads that were found and updated
+    """
+    now = utcnow()
+    updated = [
+        lead_id for lead_id in (
+            _write_lead_analysis(db, lead_id, analysis, message, now)
+            for lead_id, analysis, message in results
+        ) if lead_id is not None
+    ]
+    db.commit()
+    _invalidate_caches()
+    return updated
 
 
 def delete_lead(db: Session, lead_id: int) -> bool:
-    """Delete a lead (cascades to history, emails, tags)"""
-    lead = get_lead_by_id(db, lead_id)
-    if not lead:
+    """
+    Delete a lead with its history, emails and tags.
+
+    Four DELETEs in one transaction. The ORM cascade would first SELECT the
+    lead and each of its collections, then delete the children row by row.
+    """
+    for child in (LeadStatusHistory, EmailSend, LeadTag):
+        db.execute(delete(child).where(child.lead_id == lead_id)
+                   .execution_options(synchronize_session=False))
+    deleted = db.execute(
+        delete(Lead).where(Lead.id == lead_id).returning(Lead.id)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    if deleted is None:
         return False
 
-    db.delete(lead)
     db.commit()
+    _invalidate_caches()
     return True
 
 
@@ -313,6 +567,7 @@ def log_email_send(db: Session, lead_id: int, subject: str, body: str,
         update_lead_status(db, lead_id, 'contacted', notes='Email sent')
     else:
         db.commit()
+        lead_detail_cache.clear()
 
     db.refresh(email)
     return email
@@ -325,13 +580,14 @@ def mark_email_replied(db: Session, email_id: int, reply_content: Optional[str]
         return None
 
     email.replied = True
-    email.replied_at = datetime.utcnow()
+    email.replied_at = utcnow()
     email.reply_content = reply_content
 
     # Update lead status to 'replied'
     update_lead_status(db, email.lead_id, 'replied', notes='Lead replied to email')
 
     db.commit()
+    lead_detail_cache.clear()
     db.refresh(email)
     return email
 
@@ -381,7 +637,7 @@ def complete_scraper_session(db: Session, session_id: int, status: str = 'comple
     if not session:
         return None
 
-    session.completed_at = datetime.utcnow()
+    session.completed_at = utcnow()
     session.status = status
     if error_message:
         session.error_message = error_message
@@ -400,21 +656,64 @@ def get_recent_scraper_sessions(db: Session, limit: int = 10) -> List[ScraperSes
 # TAG OPERATIONS
 # ============================================================================
 
-def add_tag_to_lead(db: Session, lead_id: int, tag: str) -> LeadTag:
-    """Add a tag to a lead"""
-    # Check if tag already exists
-    existing = db.query(LeadTag).filter(
-        and_(LeadTag.lead_id == lead_id, LeadTag.tag == tag)
-    ).first()
+def add_tag_to_lead(db: Session, lead_id: int, tag: str) -> Optional[int]:
+    """
+    Add a tag to a lead (a no-op if it already has it).
 
-    if existing:
-        return existing
+    A single INSERT ... SELECT that only inserts when the lead exists and
+    lacks the tag, with RETURNING id in place of a follow-up SELECT.
 
-    lead_tag = LeadTag(lead_id=lead_id, tag=tag)
-    db.add(lead_tag)
+    Returns:
+        The tag row's ID, or None if the lead doesn't exist
+    """
+    already_tagged = select(LeadTag.id).where(LeadTag.lead_id == lead_id, LeadTag.tag == tag).exists()
+    tag_id = db.execute(
+        insert(LeadTag)
+        .from_select(
+            ['lead_id', 'tag', 'created_at'],
+            select(Lead.id, literal(tag), literal(utcnow(), DateTime))
+            .where(Lead.id == lead_id, ~already_tagged)
+        )
+        .returning(LeadTag.id)
+    ).scalar()
+    db.commit()
+    if tag_id is not None:
+        lead_detail_cache.clear()
+
+    if tag_id is None:
+        # Nothing inserted: the tag was already there, or there is no such lead
+        tag_id = db.query(LeadTag.id).filter(
+            and_(LeadTag.lead_id == lead_id, LeadTag.tag == tag)
+        ).scalar()
+    return tag_id
+
+
+def add_tag_to_leads(db: Session, lead_ids: List[int], tag: str) -> int:
+    """
+    Add a tag to several leads with one INSERT ... SELECT (see add_tag_to_lead).
+
+    Leads that don't exist or already have the tag are skipped.
+
+    Returns:
+        Number of tags inserted
+    """
+    if not lead_ids:
+        return 0
+
+    already_tagged = select(LeadTag.id).where(LeadTag.lead_id == Lead.id, LeadTag.tag == tag).exists()
+    inserted = db.execute(
+        insert(LeadTag)
+        .from_select(
+            ['lead_id', 'tag', 'created_at'],
+            select(Lead.id, literal(tag), literal(utcnow(), DateTime))
+            .where(Lead.id.in_(lead_ids), ~already_tagged)
+        )
+        .returning(LeadTag.id)
+    ).scalars().all()
     db.commit()
-    db.refresh(lead_tag)
-    return lead_tag
+    if inserted:
+        lead_detail_cache.clear()
+    return len(inserted)
 
 
 def remove_tag_from_lead(db: Session, lead_id: int, tag: str) -> bool:
@@ -428,6 +727,7 @@ def remove_tag_from_lead(db: Session, lead_id: int, tag: str) -> bool:
 
     db.delete(lead_tag)
     db.commit()
+    lead_detail_cache.clear()
     return True
 
 
@@ -441,98 +741,140 @@ def get_tags_for_lead(db: Session, lead_id: int) -> List[str]:
 # ANALYTICS / STATS
 # ============================================================================
 
-def get_dashboard_stats(db: Session, days: int = 30) -> Dict[str, Any]:
+def _build_dashboard_counts_stmt():
     """
-    Get dashboard statistics.
+    The get_dashboard_counts SELECT, built once at import.
 
-    Args:
-        db: Database session
-        days: Number of days to look back
-
-    Returns:
-        Dictionary with key metrics
+    The date windows are bind parameters, so every call reuses this
+    expression tree, and its compiled SQL from SQLAlchemy's statement cache,
+    instead of rebuilding both with fresh literal timestamps.
     """
-    date_cutoff = datetime.utcnow() - timedelta(days=days)
+    conditions = {
+        'recent_leads': Lead.created_at >= bindparam('date_cutoff', type_=DateTime),
+        'analyzed_today': Lead.analyzed_at >= bindparam('today_start', type_=DateTime),
+        'qualified_leads': Lead.score.in_(['A+', 'A']),
+        'contacted_this_week': Lead.contacted_at >= bindparam('week_start', type_=DateTime),
+        'contacted_total': Lead.contacted_at.isnot(None),
+        'score_A+': Lead.score == 'A+',
+        'score_A': Lead.score == 'A',
+        'score_B': Lead.score == 'B',
+        'score_C': Lead.score == 'C',
+    }
+    for status in ('new', 'analyzed', 'contacted', 'replied', 'won'):
+        conditions[f'status_{status}'] = Lead.status == status
 
-    # Total leads
-    total_leads = db.query(func.count(Lead.id)).scalar()
+    return select(
+        func.count().label('total_leads'),
+        *(func.count(case((condition, 1))).label(name) for name, condition in conditions.items())
+    ).select_from(Lead)
 
-    # Leads created in time period
-    recent_leads = db.query(func.count(Lead.id)).filter(
-        Lead.created_at >= date_cutoff
-    ).scalar()
 
-    # Analyzed today
-    today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-    analyzed_today = db.query(func.count(Lead.id)).filter(
-        Lead.analyzed_at >= today_start
-    ).scalar()
+DASHBOARD_COUNTS_STMT = _build_dashboard_counts_stmt()
 
-    # Qualified leads (A+ and A)
-    qualified_leads = db.query(func.count(Lead.id)).filter(
-        Lead.score.in_(['A+', 'A'])
-    ).scalar()
 
-    # Contacted this week
-    week_start = datetime.utcnow() - timedelta(days=7)
-    contacted_this_week = db.query(func.count(Lead.id)).filter(
-        Lead.contacted_at >= week_start
-    ).scalar()
+def get_dashboard_counts(db: Session, days: int = 30) -> Dict[str, int]:
+    """
+    Every lead count the dashboard shows, computed in one table scan.
 
-    # Replied leads
-    replied_leads = db.query(func.count(Lead.id)).filter(
-        Lead.status == 'replied'
-    ).scalar()
+    Uses COUNT(CASE WHEN ... THEN 1 END) per metric instead of one
+    COUNT query per score, status and date window.
 
-    # Won leads
-    won_leads = db.query(func.count(Lead.id)).filter(
-        Lead.status == 'won'
-    ).scalar()
+    Args:
+        db: Database session
+        days: Number of days to look back for 'recent_leads'
+
+    Returns:
+        Dictionary of counts keyed by metric name
+    """
+    # One clock read, so every window in the statement shares the same "now"
+    now = utcnow()
+    row = db.execute(DASHBOARD_COUNTS_STMT, {
+        'date_cutoff': now - timedelta(days=days),
+        'today_start': now.replace(hour=0, minute=0, second=0, microsecond=0),
+        'week_start': now - timedelta(days=7),
+    }).one()
+    return dict(row._mapping)
+
+
+def get_dashboard_stats(db: Session, days: int = 30,
+                        counts: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Get dashboard statistics.
+
+    Args:
+        db: Database session
+        days: Number of days to look back
+        counts: Result of get_dashboard_counts, if the caller already has it
 
-    # Score distribution
-    score_distribution = {}
-    for score in ['A+', 'A', 'B', 'C']:
-        count = db.query(func.count(Lead.id)).filter(Lead.score == score).scalar()
-        score_distribution[score] = count
+    Returns:
+        Dictionary with key metrics
+    """
+    if counts is None:
+        counts = get_dashboard_counts(db, days=days)
 
     # Source distribution
     source_results = db.query(
         Lead.source,
-        func.count(Lead.id).label('count')
+        func.count().label('count')
     ).group_by(Lead.source).all()
     source_distribution = {source: count for source, count in source_results}
 
     # Reply rate (if any contacted)
-    contacted_total = db.query(func.count(Lead.id)).filter(
-        Lead.contacted_at.isnot(None)
-    ).scalar()
+    replied_leads = counts['status_replied']
+    contacted_total = counts['contacted_total']
     reply_rate = (replied_leads / contacted_total * 100) if contacted_total > 0 else 0
 
     return {
-        'total_leads': total_leads,
-        'recent_leads': recent_leads,
-        'analyzed_today': analyzed_today,
-        'qualified_leads': qualified_leads,
-        'contacted_this_week': contacted_this_week,
+        'total_leads': counts['total_leads'],
+        'recent_leads': counts['recent_leads'],
+        'analyzed_today': counts['analyzed_today'],
+        'qualified_leads': counts['qualified_leads'],
+        'contacted_this_week': counts['contacted_this_week'],
         'replied_leads': replied_leads,
-        'won_leads': won_leads,
+        'won_leads': counts['status_won'],
         'reply_rate': round(reply_rate, 1),
-        'score_distribution': score_distribution,
+        'score_distribution': {score: counts[f'score_{score}'] for score in ['A+', 'A', 'B', 'C']},
         'source_distribution': source_distribution,
     }
 
 
-def get_conversion_funnel(db: Session) -> Dict[str, int]:
-    """Get conversion funnel metrics"""
+def get_conversion_funnel(db: Session, counts: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """Get conversion funnel metrics (pass get_dashboard_counts' result to skip the query)"""
+    if counts is None:
+        counts = get_dashboard_counts(db)
     return {
-        'new': db.query(func.count(Lead.id)).filter(Lead.status == 'new').scalar(),
-        'analyzed': db.query(func.count(Lead.id)).filter(Lead.status == 'analyzed').scalar(),
-        'contacted': db.query(func.count(Lead.id)).filter(Lead.status == 'contacted').scalar(),
-        'replied': db.query(func.count(Lead.id)).filter(Lead.status == 'replied').scalar(),
-        'won': db.query(func.count(Lead.id)).filter(Lead.status == 'won').scalar(),
+        status: counts[f'status_{status}']
+        for status in ('new', 'analyzed', 'contacted', 'replied', 'won')
     }
 
 
+def _snapshot_key(days: int) -> Tuple[str, int]:
+    """dashboard_cache key for a look-back window"""
+    return ('dashboard', days)
+
+
+def get_dashboard_snapshot(db: Session, days: int = 30) -> Dict[str, Any]:
+    """
+    Stats and conversion funnel for the dashboard, cached for a few seconds.
+
+    Returns:
+        {'stats': get_dashboard_stats(...), 'funnel': get_conversion_funnel(...)}
+    """
+    def compute():
+        counts = get_dashboard_counts(db, days=days)
+        return {
+            'stats': get_dashboard_stats(db, days=days, counts=counts),
+            'funnel': get_conversion_funnel(db, counts=counts),
+        }
+
+    return dashboard_cache.get_or_compute(_snapshot_key(days), compute)
+
+
+def get_cached_dashboard_snapshot(days: int = 30) -> Optional[Dict[str, Any]]:
+    """get_dashboard_snapshot's cached result without touching the database, or None"""
+    return dashboard_cache.get(_snapshot_key(days))
+
+
 if __name__ == '__main__':
     # Test database operations
     print("Testing database operations...")
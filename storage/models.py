@@ -5,14 +5,19 @@ This module defines the database schema for leads, analytics, and tracking.
 Uses SQLite for simplicity (perfect for personal use).
 """
 
-from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, DateTime, Boolean, JSON, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 
 Base = declarative_base()
 
 
+def utcnow() -> datetime:
+    """Current UTC time as a naive datetime (how the DateTime columns store it)"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Lead(Base):
     """
     Main lead table - stores all lead information and analysis results.
@@ -61,7 +66,7 @@ class Lead(Base):
     # Possible values: 'new', 'analyzed', 'contacted', 'replied', 'won', 'lost', 'archived'
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    created_at = Column(DateTime, default=utcnow, nullable=False, index=True)
     analyzed_at = Column(DateTime, nullable=True)
     contacted_at = Column(DateTime, nullable=True)
     replied_at = Column(DateTime, nullable=True)
@@ -73,6 +78,19 @@ class Lead(Base):
     email_sends = relationship("EmailSend", back_populates="lead", cascade="all, delete-orphan")
     tags = relationship("LeadTag", back_populates="lead", cascade="all, delete-orphan")
 
+    # The list views filter on one of these (or status and score together)
+    # and sort newest first. id is in each key so the (created_at, id)
+    # order comes straight off the index, with no sort for the tie-breaker.
+    __table_args__ = (
+        Index('ix_leads_status_created_id', 'status', created_at.desc(), id.desc()),
+        Index('ix_leads_source_created_id', 'source', created_at.desc(), id.desc()),
+        Index('ix_leads_score_created_id', 'score', created_at.desc(), id.desc()),
+        Index('ix_leads_status_score_created_id', 'status', 'score', created_at.desc(), id.desc()),
+        # Holds every column get_dashboard_counts reads, so its one
+        # aggregate is an index-only scan instead of a walk over the table
+        Index('ix_leads_dashboard', 'status', 'score', 'created_at', 'analyzed_at', 'contacted_at'),
+    )
+
     def __repr__(self):
         return f"<Lead(id={self.id}, name='{self.name}', score='{self.score}', status='{self.status}')>"
 
@@ -116,7 +134,7 @@ class LeadStatusHistory(Base):
 
     old_status = Column(String(50), nullable=True)
     new_status = Column(String(50), nullable=False)
-    changed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    changed_at = Column(DateTime, default=utcnow, nullable=False)
     notes = Column(Text, nullable=True)
 
     # Relationships
@@ -137,7 +155,7 @@ class EmailSend(Base):
 
     subject = Column(String(500), nullable=False)
     body = Column(Text, nullable=False)
-    sent_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    sent_at = Column(DateTime, default=utcnow, nullable=False, index=True)
 
     # Email tracking
     opened = Column(Boolean, default=False)
@@ -173,7 +191,7 @@ class ScraperSession(Base):
     leads_duplicates = Column(Integer, default=0)
 
     # Timing
-    started_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    started_at = Column(DateTime, default=utcnow, nullable=False, index=True)
     completed_at = Column(DateTime, nullable=True)
 
     # Status
@@ -204,7 +222,7 @@ class LeadTag(Base):
     lead_id = Column(Integer, ForeignKey('leads.id', ondelete='CASCADE'), nullable=False, index=True)
 
     tag = Column(String(100), nullable=False, index=True)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=utcnow, nullable=False)
 
     # Relationships
     lead = relationship("Lead", back_populates="tags")
@@ -214,6 +232,79 @@ class LeadTag(Base):
 
 
 # Database initialization helper
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    WAL lets the web app read while a pipeline writes, and with
+    synchronous=NORMAL a commit no longer waits on two fsyncs.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-65536")    # 64 MB
+    cursor.close()
+
+
+QUERY_CACHE_SIZE = 1200
+
+# Full-text index over the searchable lead columns. External-content FTS5:
+# lead_fts stores only the inverted index and the triggers keep it in step
+# with leads.
+SEARCH_INDEX_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS lead_fts USING fts5("
+    "name, company, content, content='leads', content_rowid='id')",
+    "CREATE TRIGGER IF NOT EXISTS leads_fts_insert AFTER INSERT ON leads BEGIN "
+    "INSERT INTO lead_fts(rowid, name, company, content) "
+    "VALUES (new.id, new.name, new.company, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS leads_fts_delete AFTER DELETE ON leads BEGIN "
+    "INSERT INTO lead_fts(lead_fts, rowid, name, company, content) "
+    "VALUES ('delete', old.id, old.name, old.company, old.content); END",
+    "CREATE TRIGGER IF NOT EXISTS leads_fts_update AFTER UPDATE OF name, company, content ON leads BEGIN "
+    "INSERT INTO lead_fts(lead_fts, rowid, name, company, content) "
+    "VALUES ('delete', old.id, old.name, old.company, old.content); "
+    "INSERT INTO lead_fts(rowid, name, company, content) "
+    "VALUES (new.id, new.name, new.company, new.content); END",
+]
+
+
+def _create_search_index(engine):
+    """Create lead_fts and its triggers on first run, backfilling existing leads"""
+    if has_search_index(engine):
+        return
+    try:
+        with engine.begin() as conn:
+            for ddl in SEARCH_INDEX_DDL:
+                conn.exec_driver_sql(ddl)
+            conn.exec_driver_sql("INSERT INTO lead_fts(lead_fts) VALUES ('rebuild')")
+    except Exception as e:
+        # SQLite built without FTS5: the search filter falls back to LIKE
+        print(f"⚠️  Full-text search index unavailable: {e}")
+
+
+def _refresh_planner_stats(engine):
+    """
+    Give the query planner table statistics so it picks the narrowest index.
+    The first run does a full ANALYZE; later ones use PRAGMA optimize, which
+    only re-analyzes tables whose size changed a lot since then.
+    """
+    with engine.begin() as conn:
+        has_stats = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+        ).first()
+        conn.exec_driver_sql("PRAGMA optimize" if has_stats else "ANALYZE")
+
+
+def has_search_index(engine) -> bool:
+    """Whether lead_fts exists in this database"""
+    if engine.dialect.name != 'sqlite':
+        return False
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='lead_fts'"
+        ).first() is not None
+
+
 def init_db(database_url='sqlite:///data/vibe-leads.db'):
     """
     Initialize the database - create all tables.
@@ -224,9 +315,33 @@ def init_db(database_url='sqlite:///data/vibe-leads.db'):
     Returns:
         engine, sessionmaker
     """
-    engine = create_engine(database_url, echo=False)
+    # Filter combinations compile to a handful of distinct statements; keep
+    # all of them in SQLAlchemy's compiled-SQL cache
+    engine_options = {'echo': False, 'query_cache_size': QUERY_CACHE_SIZE}
+    if database_url.startswith('sqlite'):
+        # Sessions are used from FastAPI's worker threads
+        engine = create_engine(database_url, connect_args={'check_same_thread': False},
+                               **engine_options)
+        event.listen(engine, 'connect', _set_sqlite_pragmas)
+    else:
+        engine = create_engine(database_url, **engine_options)
     Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    # create_all skips tables that already exist, so add indexes introduced
+    # after a database was first created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+    if engine.dialect.name == 'sqlite':
+        _create_search_index(engine)
+        _refresh_planner_stats(engine)
+
+    # Routes render templates after get_db() commits and closes the session,
+    # so keep loaded attributes (and eager-loaded relationships) instead of
+    # expiring them on commit
+    SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False,
+                                expire_on_commit=False)
     return engine, SessionLocal
 
 
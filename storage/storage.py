@@ -4,99 +4,312 @@ Handles saving leads, analysis results, and generated messages
 """
 
 import json
+import hashlib
 import csv
 import os
+import functools
+import zipfile
 from datetime import datetime
-from typing import List, Dict
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_line(record: Dict) -> bytes:
+    """Serialize one record as a compact JSON line (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(record, default=str) + b'\n'
+    return (json.dumps(record, default=str, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _json_document(obj) -> bytes:
+    """Serialize obj as an indented JSON document (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2, default=str, ensure_ascii=False).encode('utf-8')
+
+
+def _write_jsonl(filepath: Path, records: List[Dict]):
+    """Write records as JSON Lines in a single binary write"""
+    with open(filepath, 'wb') as f:
+        f.write(b''.join(_json_line(r) for r in records))
+
+
+# Sources whose 'url' is the author's profile rather than the post
+PROFILE_URL_SOURCES = frozenset({'linkedin'})
+
+
+def dedupe_key(lead: Dict, by_url: bool = True) -> str:
+    """
+    A key identifying the post: its permalink when known, else a content hash
+    A profile URL (LinkedIn) is hashed together with the content, so separate
+    posts by the same author get separate keys.
+    """
+    url = lead.get('url') or ''
+    if by_url:
+        if lead.get('post_url'):
+            return lead['post_url']
+        if url and (lead.get('source') or '').lower() not in PROFILE_URL_SOURCES:
+            return url
+    content = lead.get('content', '')
+    if by_url and url:
+        content = f"{url}\n{content}"
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def dedupe_leads(leads: List[Dict], by_url: bool = True) -> List[Dict]:
+    """
+    Drop repeated leads, keeping the first occurrence
+    Keyed on dedupe_key (the post's URL, falling back to a content hash)
+    """
+    seen = set()
+    unique = []
+    for lead in leads:
+        key = dedupe_key(lead, by_url)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(lead)
+    return unique
+
+
+# Column order of the qualified-leads CSV (matches _qualified_csv_row)
+QUALIFIED_CSV_COLUMNS = (
+    'score', 'name', 'title', 'company', 'source',
+    'pain_points', 'urgency', 'authority', 'message', 'url'
+)
+
+
+def _qualified_csv_row(result: Dict) -> Tuple:
+    """One qualified result as a CSV row tuple, in QUALIFIED_CSV_COLUMNS order"""
+    lead = result['lead']
+    analysis = result['analysis']
+    return (
+        analysis['score'],
+        lead.get('name', ''),
+        lead.get('title', ''),
+        lead.get('company', ''),
+        lead.get('source', ''),
+        ', '.join(analysis.get('pain_points', [])),
+        analysis.get('urgency', ''),
+        analysis.get('authority', ''),
+        result.get('message', ''),
+        lead.get('url', ''),
+    )
+
+
+def _message_text(lead: Dict, analysis: Dict, message: str) -> str:
+    """One outreach file: lead details, original post, message and reasoning"""
+    rule = '=' * 60
+    return '\n'.join([
+        f"TO: {lead.get('name', 'Unknown')}",
+        f"TITLE: {lead.get('title', 'Unknown')}",
+        f"COMPANY: {lead.get('company', 'Unknown')}",
+        f"SOURCE: {lead.get('source', 'Unknown')}",
+        f"URL: {lead.get('url', '')}",
+        f"SCORE: {analysis['score']}",
+        f"PAIN POINTS: {', '.join(analysis.get('pain_points', []))}",
+        "",
+        rule,
+        "ORIGINAL POST:",
+        lead.get('content', ''),
+        "",
+        rule,
+        "OUTREACH MESSAGE:",
+        "",
+        message,
+        "",
+        rule,
+        "ANALYSIS:",
+        analysis.get('reasoning', ''),
+        "",
+    ])
+
+
+def _summary_text(qualified: List[Dict], timestamp: str) -> str:
+    """SUMMARY.txt for an outreach batch"""
+    rule = '=' * 60
+    scores = Counter(r['analysis']['score'] for r in qualified)
+    lines = [
+        f"OUTREACH BATCH - {timestamp}",
+        rule,
+        "",
+        f"Total messages: {len(qualified)}",
+        f"A+ leads: {scores['A+']}",
+        f"A leads: {scores['A']}",
+        "",
+        rule,
+        "",
+        "FILES:",
+    ]
+    for i, result in enumerate(qualified, 1):
+        lead = result['lead']
+        lines.append(f"{i}. [{result['analysis']['score']}] "
+                     f"{lead.get('name', 'Unknown')} - {lead.get('company', 'Unknown')}")
+    lines.append("")
+    return '\n'.join(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_dirs(data_dir: str):
+    """Create data_dir and LeadStorage's subdirectories (cached: runs once per path)"""
+    root = Path(data_dir)
+    root.mkdir(exist_ok=True)
+    for name in ("raw_leads", "processed", "qualified", "messages"):
+        (root / name).mkdir(exist_ok=True)
+
+
+class JsonlWriter:
+    """
+    Appends records to a JSON Lines file, one line per record.
+    Each line is flushed immediately so a crash keeps everything written so far.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+
+    def write(self, record: Dict):
+        self._file.write(_json_line(record))
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class LeadStorage:
     def __init__(self, data_dir: str = "data"):
         """Initialize storage with data directory"""
         self.data_dir = Path(data_dir)
-        self.data_dir.mkdir(exist_ok=True)
-        
-        # Create subdirectories
         self.raw_dir = self.data_dir / "raw_leads"
         self.processed_dir = self.data_dir / "processed"
         self.qualified_dir = self.data_dir / "qualified"
         self.messages_dir = self.data_dir / "messages"
-        
-        for dir in [self.raw_dir, self.processed_dir, self.qualified_dir, self.messages_dir]:
-            dir.mkdir(exist_ok=True)
+
+        # Subdirectories are created once per data_dir per process
+        _ensure_dirs(str(self.data_dir))
     
-    def save_raw_leads(self, leads: List[Dict], source: str) -> str:
-        """Save raw scraped leads"""
+    @staticmethod
+    def _prefix(kind: str, source: str) -> str:
+        """Filename prefix, e.g. qualified_my_leads"""
+        return f"{kind}_{source}" if source else kind
+
+    def save_raw_leads(self, leads: List[Dict], source: str, to_db: bool = False) -> str:
+        """Save raw scraped leads (to_db also inserts them into the app database)"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{source}_{timestamp}.json"
+        filename = f"{source}_{timestamp}.jsonl"
         filepath = self.raw_dir / filename
         
-        with open(filepath, 'w') as f:
-            json.dump(leads, f, indent=2, default=str)
+        _write_jsonl(filepath, leads)
         
         print(f"✅ Saved {len(leads)} raw leads to {filepath}")
+        if to_db:
+            self.save_leads_to_db(leads)
         return str(filepath)
+
+    def save_leads_to_db(self, leads: List[Dict]) -> int:
+        """
+        Insert scraped leads into the app database in one transaction
+        external_id is the per-post dedupe_key, so posts already stored are
+        skipped while a new post by a known author is still inserted.
+        Returns the number of new leads
+        """
+        from storage.database import get_db, create_leads_bulk
+
+        rows = [
+            {
+                'external_id': dedupe_key(lead),
+                'name': lead.get('name') or 'Unknown',
+                'title': lead.get('title'),
+                'company': lead.get('company'),
+                'source': (lead.get('source') or 'scraped').lower(),
+                'url': lead.get('url'),
+                'content': lead.get('content'),
+            }
+            for lead in leads
+        ]
+        with get_db() as db:
+            created = len(create_leads_bulk(db, rows))
+        print(f"✅ Added {created} new leads to the database")
+        return created
     
-    def save_processed_results(self, results: List[Dict]) -> str:
+    def open_raw_leads(self, source: str) -> JsonlWriter:
+        """
+        Open a raw-leads file for incremental writes
+        Use as a context manager and call write(lead) as leads are scraped
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = self.raw_dir / f"{source}_{timestamp}.jsonl"
+        return JsonlWriter(filepath)
+
+    def save_processed_results(self, results: List[Dict], source: str = "") -> str:
         """Save processed results with analysis"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"processed_{timestamp}.json"
+        filename = f"{self._prefix('processed', source)}_{timestamp}.jsonl"
         filepath = self.processed_dir / filename
         
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+        _write_jsonl(filepath, results)
         
         print(f"✅ Saved processed results to {filepath}")
         return str(filepath)
     
-    def save_qualified_leads(self, results: List[Dict]) -> str:
-        """Save only A+ and A leads with their messages"""
+    def open_processed_results(self, source: str = "") -> JsonlWriter:
+        """
+        Open a processed-results file for incremental writes
+        Pass its write method as process_batch_async(on_result=...) to store
+        each result as soon as it is ready
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filepath = self.processed_dir / f"{self._prefix('processed', source)}_{timestamp}.jsonl"
+        return JsonlWriter(filepath)
+
+    def save_qualified_leads(self, results: List[Dict], source: str = "") -> Tuple[Optional[str], Optional[str]]:
+        """Save only A+ and A leads with their messages, returns (json_file, csv_file)"""
         qualified = [r for r in results if r['analysis'].get('score') in ['A+', 'A']]
         
         if not qualified:
             print("⚠️  No qualified leads to save")
-            return None
+            return None, None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Save as JSON
-        json_file = self.qualified_dir / f"qualified_{timestamp}.json"
-        with open(json_file, 'w') as f:
-            json.dump(qualified, f, indent=2, default=str)
+        prefix = self._prefix('qualified', source)
+        json_file = self.qualified_dir / f"{prefix}_{timestamp}.json"
+        with open(json_file, 'wb') as f:
+            f.write(_json_document(qualified))
         
         # Save as CSV for easy review
-        csv_file = self.qualified_dir / f"qualified_{timestamp}.csv"
+        csv_file = self.qualified_dir / f"{prefix}_{timestamp}.csv"
         with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'score', 'name', 'title', 'company', 'source', 
-                'pain_points', 'urgency', 'authority', 'message', 'url'
-            ])
-            writer.writeheader()
-            
-            for r in qualified:
-                writer.writerow({
-                    'score': r['analysis']['score'],
-                    'name': r['lead'].get('name', ''),
-                    'title': r['lead'].get('title', ''),
-                    'company': r['lead'].get('company', ''),
-                    'source': r['lead'].get('source', ''),
-                    'pain_points': ', '.join(r['analysis'].get('pain_points', [])),
-                    'urgency': r['analysis'].get('urgency', ''),
-                    'authority': r['analysis'].get('authority', ''),
-                    'message': r.get('message', ''),
-                    'url': r['lead'].get('url', '')
-                })
+            writer = csv.writer(f)
+            writer.writerow(QUALIFIED_CSV_COLUMNS)
+            writer.writerows(_qualified_csv_row(r) for r in qualified)
         
         print(f"✅ Saved {len(qualified)} qualified leads")
         print(f"   JSON: {json_file}")
         print(f"   CSV: {csv_file}")
-        return str(csv_file)
+        return str(json_file), str(csv_file)
     
-    def export_messages_for_outreach(self, results: List[Dict]) -> str:
+    def export_messages_for_outreach(self, results: List[Dict], source: str = "",
+                                     archive: bool = False) -> str:
         """
         Export messages in a format ready for outreach
-        One file per lead for easy copy-paste
+        One file per lead for easy copy-paste, or with archive=True a single
+        .zip holding the same files (one file to create instead of one per lead)
         """
         qualified = [r for r in results if r.get('message')]
         
@@ -105,84 +318,62 @@ class LeadStorage:
             return None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        batch_dir = self.messages_dir / f"batch_{timestamp}"
-        batch_dir.mkdir(exist_ok=True)
-        
-        # Create individual message files
+        batch_dir = self.messages_dir / f"{self._prefix('batch', source)}_{timestamp}"
+
+        # (filename, text) for every message file, then the summary
+        files = []
         for i, result in enumerate(qualified, 1):
             lead = result['lead']
             analysis = result['analysis']
-            message = result['message']
             
             # Safe filename
             name = lead.get('name', 'unknown').replace(' ', '_').replace('/', '_')
-            score = analysis['score']
-            filename = f"{score}_{i:02d}_{name}.txt"
-            
-            filepath = batch_dir / filename
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"TO: {lead.get('name', 'Unknown')}\n")
-                f.write(f"TITLE: {lead.get('title', 'Unknown')}\n")
-                f.write(f"COMPANY: {lead.get('company', 'Unknown')}\n")
-                f.write(f"SOURCE: {lead.get('source', 'Unknown')}\n")
-                f.write(f"URL: {lead.get('url', '')}\n")
-                f.write(f"SCORE: {score}\n")
-                f.write(f"PAIN POINTS: {', '.join(analysis.get('pain_points', []))}\n")
-                f.write(f"\n{'='*60}\n")
-                f.write(f"ORIGINAL POST:\n")
-                f.write(f"{lead.get('content', '')}\n")
-                f.write(f"\n{'='*60}\n")
-                f.write(f"OUTREACH MESSAGE:\n\n")
-                f.write(message)
-                f.write(f"\n\n{'='*60}\n")
-                f.write(f"ANALYSIS:\n")
-                f.write(f"{analysis.get('reasoning', '')}\n")
-        
-        # Create summary file
-        summary_file = batch_dir / "SUMMARY.txt"
-        with open(summary_file, 'w') as f:
-            f.write(f"OUTREACH BATCH - {timestamp}\n")
-            f.write(f"{'='*60}\n\n")
-            f.write(f"Total messages: {len(qualified)}\n")
-            
-            a_plus = sum(1 for r in qualified if r['analysis']['score'] == 'A+')
-            a_leads = sum(1 for r in qualified if r['analysis']['score'] == 'A')
-            
-            f.write(f"A+ leads: {a_plus}\n")
-            f.write(f"A leads: {a_leads}\n\n")
-            f.write(f"{'='*60}\n\n")
-            f.write("FILES:\n")
-            for i, result in enumerate(qualified, 1):
-                lead = result['lead']
-                score = result['analysis']['score']
-                f.write(f"{i}. [{score}] {lead.get('name', 'Unknown')} - {lead.get('company', 'Unknown')}\n")
+            filename = f"{analysis['score']}_{i:02d}_{name}.txt"
+            files.append((filename, _message_text(lead, analysis, result['message'])))
+        files.append(("SUMMARY.txt", _summary_text(qualified, timestamp)))
+
+        if archive:
+            target = batch_dir.with_suffix('.zip')
+            with zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+                for filename, text in files:
+                    zf.writestr(filename, text)
+            print(f"✅ Exported {len(qualified)} messages to {target}")
+            return str(target)
+
+        batch_dir.mkdir(exist_ok=True)
+        for filename, text in files:
+            (batch_dir / filename).write_text(text, encoding='utf-8')
         
         print(f"✅ Exported {len(qualified)} messages to {batch_dir}")
         print(f"   Each message in separate file for easy copy-paste")
-        print(f"   See {summary_file} for overview")
+        print(f"   See {batch_dir / 'SUMMARY.txt'} for overview")
         
         return str(batch_dir)
     
     def get_stats(self, results: List[Dict]) -> Dict:
-        """Generate statistics from results"""
+        """Generate statistics from results in a single pass over the scores"""
         total = len(results)
-        if total == 0:
-            return {}
-        
-        scores = [r['analysis'].get('score', 'ERROR') for r in results]
-        
+        scores = Counter(r['analysis'].get('score', 'ERROR') for r in results)
+        qualified = scores['A+'] + scores['A']
+
+        def pct(count):
+            return count / total * 100 if total else 0.0
+
         stats = {
             'total': total,
-            'a_plus': scores.count('A+'),
-            'a': scores.count('A'),
-            'b': scores.count('B'),
-            'c': scores.count('C'),
-            'errors': scores.count('ERROR'),
-            'qualified': scores.count('A+') + scores.count('A'),
-            'qualification_rate': (scores.count('A+') + scores.count('A')) / total * 100
+            'a_plus': scores['A+'],
+            'a': scores['A'],
+            'b': scores['B'],
+            'c': scores['C'],
+            'errors': scores['ERROR'],
+            'qualified': qualified,
+            'qualification_rate': pct(qualified),
+            'a_plus_pct': pct(scores['A+']),
+            'a_pct': pct(scores['A']),
+            'b_pct': pct(scores['B']),
+            'c_pct': pct(scores['C']),
         }
-        
+
         return stats
 
 
@@ -6,6 +6,7 @@ Uses htmx for interactive UI without complex JavaScript.
 """
 
 import os
+import asyncio
 from pathlib import Path
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
@@ -15,6 +16,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 # Import routes (will be created)
 from web.routes import dashboard, leads
+from log_setup import setup_logging
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -23,13 +25,17 @@ app = FastAPI(
     version="0.9.0"
 )
 
-# CORS middleware (for development)
+# CORS middleware: only the UI's own origin(s), comma-separated in APP_ORIGIN.
+# A wildcard with credentials is rejected by browsers anyway, and max_age lets
+# them cache preflights instead of sending one before every htmx POST/DELETE.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify your domain
+    allow_origins=[origin.strip() for origin in
+                   os.getenv("APP_ORIGIN", "http://localhost:8000").split(",") if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
 # Setup static files and templates
@@ -128,14 +134,30 @@ async def startup_event():
     """Run on application startup"""
     print("🚀 Vibe-Leads starting up...")
 
+    # uvicorn only configures its own loggers; route the processor's progress
+    # (vibe.processor, from /leads/*/analyze jobs) to stdout as well
+    setup_logging(root=False)
+
     # Ensure data directory exists
     os.makedirs("data", exist_ok=True)
 
-    # Initialize database (creates tables if they don't exist)
-    from storage.models import init_db
-    init_db()
+    # Initialize database (creates tables if they don't exist). This builds the
+    # process-wide engine and pool that every get_db() call then reuses,
+    # rather than a throwaway engine of its own.
+    from storage.database import get_session_factory
+    get_session_factory()
 
     print("✅ Database initialized")
+
+    # Build the lead processor (config files, LLM client) now rather than on
+    # the first analyze request
+    from web.routes.leads import get_processor
+    try:
+        await asyncio.to_thread(get_processor)
+        print("✅ Lead processor ready")
+    except Exception as e:
+        # No LLM configured yet: the app still serves, analysis reports the error
+        print(f"⚠️  Lead processor not ready: {e}")
     print("✅ Vibe-Leads ready! Open http://localhost:8000")
 
 
@@ -144,6 +166,11 @@ async def shutdown_event():
     """Run on application shutdown"""
     print("👋 Vibe-Leads shutting down...")
 
+    # Close the processor's pooled LLM clients while their loop is still running
+    from web.routes import leads
+    if leads.processor is not None:
+        await leads.processor.aclose()
+
 
 if __name__ == "__main__":
     import uvicorn
@@ -4,16 +4,48 @@ Dashboard routes for Vibe-Leads.
 Main landing page with stats overview and recent leads.
 """
 
-from fastapi import APIRouter, Request
+import json
+import asyncio
+import hashlib
+
+from fastapi import APIRouter, Request, Response
 from fastapi.responses import HTMLResponse
 
-from storage.database import get_db, get_dashboard_stats, get_all_leads, get_conversion_funnel
+from storage.database import (
+    get_db,
+    get_dashboard_snapshot,
+    get_cached_dashboard_snapshot,
+    get_leads_projection
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 router = APIRouter()
 
+# Lead columns the recent-leads panel of dashboard.html renders
+RECENT_COLUMNS = ['id', 'name', 'title', 'company', 'content', 'score', 'source', 'urgency', 'created_at']
+
+# (snapshot, body, etag) for the last /stats payload; the snapshot object
+# only changes when the dashboard cache recomputes, so polls reuse the bytes
+_stats_body = (None, b'', '')
+
+
+def _encode_stats(snapshot):
+    """Serialized body and ETag for a dashboard snapshot (memoized on the last one)"""
+    global _stats_body
+    cached_snapshot, body, etag = _stats_body
+    if snapshot is not cached_snapshot:
+        body = orjson.dumps(snapshot) if orjson else json.dumps(snapshot).encode('utf-8')
+        etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+        _stats_body = (snapshot, body, etag)
+    return body, etag
+
 
 @router.get("/", response_class=HTMLResponse)
-async def dashboard(request: Request):
+def dashboard(request: Request):
     """
     Main dashboard page.
 
@@ -26,14 +58,14 @@ async def dashboard(request: Request):
     templates = request.app.state.templates
 
     with get_db() as db:
-        # Get dashboard statistics
-        stats = get_dashboard_stats(db, days=30)
+        # Dashboard statistics and conversion funnel (one aggregate scan, cached)
+        snapshot = get_dashboard_snapshot(db, days=30)
+        stats = snapshot['stats']
+        funnel = snapshot['funnel']
 
         # Get recent leads (last 10)
-        recent_leads = get_all_leads(db, limit=10, offset=0)
-
-        # Get conversion funnel
-        funnel = get_conversion_funnel(db)
+        # Plain rows, content cut to the 150-character preview in SQL
+        recent_leads = get_leads_projection(db, RECENT_COLUMNS, limit=10, preview=150)
 
     return templates.TemplateResponse(
         "dashboard.html",
@@ -47,18 +79,30 @@ async def dashboard(request: Request):
     )
 
 
+def _load_snapshot():
+    with get_db() as db:
+        return get_dashboard_snapshot(db, days=30)
+
+
 @router.get("/stats")
-async def get_stats():
+async def get_stats(request: Request):
     """
     API endpoint for dashboard stats (for htmx updates).
 
-    Returns JSON with current statistics.
+    Returns JSON with current statistics, or 304 when the poller's
+    If-None-Match still matches.
+
+    Polls answered from the dashboard cache stay on the event loop; only a
+    cache miss takes a threadpool worker and a database connection.
     """
-    with get_db() as db:
-        stats = get_dashboard_stats(db, days=30)
-        funnel = get_conversion_funnel(db)
+    # Already shaped as {"stats": ..., "funnel": ...}
+    snapshot = get_cached_dashboard_snapshot(days=30)
+    if snapshot is None:
+        snapshot = await asyncio.to_thread(_load_snapshot)
 
-    return {
-        "stats": stats,
-        "funnel": funnel
-    }
+    body, etag = _encode_stats(snapshot)
+    # no-cache: the browser may keep the body but must revalidate every poll
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type='application/json', headers=headers)
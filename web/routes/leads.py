@@ -4,117 +4,221 @@ Leads management routes for Vibe-Leads.
 Handles lead CRUD operations, analysis, filtering, and status updates.
 """
 
-from fastapi import APIRouter, Request, Form, HTTPException
+import os
+import asyncio
+import threading
+import uuid
+import hashlib
+from collections import OrderedDict
+
+from fastapi import APIRouter, Request, Response, Form, HTTPException
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
 from storage.database import (
     get_db,
     get_all_leads,
-    count_leads,
+    count_leads_cached,
+    encode_cursor,
+    decode_cursor,
     get_lead_by_id,
+    get_leads_by_ids,
     create_lead,
     update_lead,
     update_lead_status,
+    update_leads_status,
     delete_lead,
-    get_tags_for_lead,
     add_tag_to_lead,
-    save_lead_analysis
+    add_tag_to_leads,
+    save_lead_analysis,
+    save_lead_analyses
 )
+from storage.cache import leads_page_cache, lead_detail_cache
 from processors.claude_processor import LeadProcessor
 
-router = APIRouter()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson when it is installed (stdlib json otherwise)"""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            # Non-str keys: batch jobs map lead IDs to scores
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# Lead columns leads_list.html renders
+LIST_COLUMNS = ['id', 'name', 'title', 'company', 'pain_points', 'score', 'source', 'status', 'created_at']
+
+# Leads accepted by one POST /leads/analyze/batch or /leads/bulk/*
+MAX_BATCH_LEADS = 500
+# Concurrent LLM calls per batch job, as in the CLI pipelines
+BATCH_CONCURRENCY = int(os.getenv('LEAD_CONCURRENCY', '8'))
+
+# Background analyses by job id, oldest first; finished ones are trimmed
+# past MAX_ANALYSIS_JOBS so the table stays small
+MAX_ANALYSIS_JOBS = 200
+_analysis_jobs: "OrderedDict[str, dict]" = OrderedDict()
+# Unfinished job per lead ID: a repeat analyze request joins it instead of
+# paying for a second LLM call whose save would race the first
+_inflight_jobs: Dict[int, dict] = {}
+# Strong references to running analysis tasks (the loop only keeps weak ones)
+_analysis_tasks = set()
 
 # Initialize processor (will be used for analyzing leads)
-processor = None  # Lazy load
+processor = None  # Lazy load, or warmed by the app's startup hook
+_processor_lock = threading.Lock()
 
 
 def get_processor():
-    """Get or create processor instance"""
+    """Get or create processor instance (built once, even under concurrent first calls)"""
     global processor
     if processor is None:
-        processor = LeadProcessor(config_dir="config")
+        with _processor_lock:
+            if processor is None:
+                processor = LeadProcessor(config_dir="config")
     return processor
 
 
+async def _get_processor_async():
+    """get_processor without blocking the event loop on the first construction"""
+    return processor if processor is not None else await asyncio.to_thread(get_processor)
+
+
 @router.get("/", response_class=HTMLResponse)
-async def leads_list(
+def leads_list(
     request: Request,
     page: int = 1,
+    cursor: Optional[str] = None,
     score: Optional[str] = None,
     status: Optional[str] = None,
     source: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    with_total: bool = False
 ):
     """
     Leads list page with filtering and pagination.
 
     Query params:
     - page: Page number (default: 1)
+    - cursor: Keyset cursor from the previous page's "Next" link
     - score: Filter by score (A+, A, B, C)
     - status: Filter by status
     - source: Filter by source
     - search: Search in name, company, content
+    - with_total: Count matching leads on every page, not just the first
+
+    htmx requests get only the table and pagination (leads_list_rows.html).
     """
     templates = request.app.state.templates
 
+    # Build filters
+    filters = {
+        name: value
+        for name, value in (('score', score), ('status', status), ('source', source), ('search', search))
+        if value
+    }
+
+    # htmx filter and page changes only swap the table; a history restore
+    # after a cache miss needs the whole page
+    partial = bool(request.headers.get('hx-request')) \
+        and not request.headers.get('hx-history-restore-request')
+
+    # The first page shows the total; later pages only need "is there a next"
+    need_total = with_total or page == 1
+
+    # Rendered pages are reused until a lead write clears the cache (or the TTL
+    # passes, for writes made by another process)
+    key = (partial, need_total, page, cursor, score, status, source, search)
+    html = leads_page_cache.get_or_compute(
+        key, lambda: _render_leads_page(templates, page, cursor, filters, partial, need_total)
+    )
+    return HTMLResponse(html, headers={'Vary': 'HX-Request'})
+
+
+def _render_leads_page(templates, page: int, cursor: Optional[str], filters: dict,
+                       partial: bool = False, need_total: bool = True) -> str:
+    """leads_list.html for one page of one filter set (leads_list_rows.html if partial)"""
     # Pagination
     per_page = 20
     offset = (page - 1) * per_page
 
-    # Build filters
-    filters = {}
-    if score:
-        filters['score'] = score
-    if status:
-        filters['status'] = status
-    if source:
-        filters['source'] = source
-    if search:
-        filters['search'] = search
+    # "Next" links carry a cursor, so moving forward seeks instead of
+    # skipping `offset` rows; page numbers are kept for display
+    before = decode_cursor(cursor) if cursor else None
+    if before:
+        offset = 0
 
     with get_db() as db:
-        # Get leads
-        leads = get_all_leads(db, limit=per_page, offset=offset, filters=filters)
+        # One extra row tells us whether a next page exists
+        leads = get_all_leads(db, limit=per_page + 1, offset=offset, filters=filters,
+                              columns=LIST_COLUMNS, before=before)
 
-        # Get total count for pagination
-        total_leads = count_leads(db, filters=filters)
+        # Total for "Page X of Y", cached per filter set rather than counted per page
+        total_leads = count_leads_cached(db, filters=filters) if need_total else None
 
     # Calculate pagination
-    total_pages = (total_leads + per_page - 1) // per_page
-
-    return templates.TemplateResponse(
-        "leads_list.html",
-        {
-            "request": request,
-            "leads": leads,
-            "total_leads": total_leads,
-            "page": page,
-            "total_pages": total_pages,
-            "filters": filters,
-            "page": "leads"
-        }
-    )
+    has_next = len(leads) > per_page
+    leads = leads[:per_page]
+    total_pages = None
+    if total_leads is not None:
+        total_pages = max((total_leads + per_page - 1) // per_page, page + has_next)
+    next_cursor = encode_cursor(leads[-1]) if has_next else None
+
+    template = "leads_list_rows.html" if partial else "leads_list.html"
+    return templates.get_template(template).render({
+        "leads": leads,
+        "total_leads": total_leads,
+        "current_page": page,
+        "total_pages": total_pages,
+        "next_cursor": next_cursor,
+        "filters": filters,
+        "partial": partial,
+        "page": "leads"
+    })
 
 
 @router.get("/{lead_id}", response_class=HTMLResponse)
-async def lead_detail(request: Request, lead_id: int):
+def lead_detail(request: Request, lead_id: int):
     """
     Lead detail page.
 
     Shows full lead information, analysis, message, and action buttons.
+    Sends an ETag; a reload whose If-None-Match still matches gets 304.
     """
     templates = request.app.state.templates
 
+    # Rendered page and its ETag, reused until a write to the lead, its tags
+    # or its emails clears the cache
+    body, etag = lead_detail_cache.get_or_compute(
+        lead_id, lambda: _render_lead_detail(templates, lead_id)
+    )
+
+    # no-cache: the browser may keep the page but must revalidate every load
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if request.headers.get('if-none-match') == etag:
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(body, headers=headers)
+
+
+def _render_lead_detail(templates, lead_id: int) -> Tuple[bytes, str]:
+    """lead_detail.html for a lead as (body, ETag); 404 if it doesn't exist"""
     with get_db() as db:
-        lead = get_lead_by_id(db, lead_id)
+        lead = get_lead_by_id(db, lead_id, load=['tags', 'emails', 'history'])
 
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
 
         # Get tags
-        tags = get_tags_for_lead(db, lead_id)
+        tags = [tag.tag for tag in lead.tags]
 
         # Get status history
         status_history = lead.status_history
@@ -122,17 +226,15 @@ async def lead_detail(request: Request, lead_id: int):
         # Get email history
         emails = lead.email_sends
 
-    return templates.TemplateResponse(
-        "lead_detail.html",
-        {
-            "request": request,
-            "lead": lead,
-            "tags": tags,
-            "status_history": status_history,
-            "emails": emails,
-            "page": "leads"
-        }
-    )
+    body = templates.get_template("lead_detail.html").render({
+        "lead": lead,
+        "tags": tags,
+        "status_history": status_history,
+        "emails": emails,
+        "page": "leads"
+    }).encode('utf-8')
+    etag = '"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+    return body, etag
 
 
 @router.get("/new/form", response_class=HTMLResponse)
@@ -151,7 +253,7 @@ async def new_lead_form(request: Request):
 
 
 @router.post("/new")
-async def create_new_lead(
+def create_new_lead(
     request: Request,
     name: str = Form(...),
     title: Optional[str] = Form(None),
@@ -194,59 +296,259 @@ async def create_new_lead(
     return RedirectResponse(url=f"/leads/{lead.id}", status_code=303)
 
 
+def _analysis_input(lead) -> dict:
+    """Lead as the dict the processor expects"""
+    return {
+        'id': lead.id,
+        'name': lead.name,
+        'title': lead.title,
+        'company': lead.company,
+        'source': lead.source,
+        'url': lead.url,
+        'content': lead.content,
+        'date': lead.created_at.date().isoformat() if lead.created_at else None
+    }
+
+
+def _lead_for_analysis(lead_id: int) -> Optional[dict]:
+    """Lead as the dict the processor expects, or None if it doesn't exist"""
+    with get_db() as db:
+        lead = get_lead_by_id(db, lead_id)
+        return _analysis_input(lead) if lead else None
+
+
+def _leads_for_analysis(lead_ids: List[int]) -> List[dict]:
+    """Processor dicts for the leads that exist, loaded in one query"""
+    with get_db() as db:
+        return [_analysis_input(lead) for lead in get_leads_by_ids(db, lead_ids)]
+
+
+def _save_analysis(lead_id: int, analysis: dict, message: Optional[str]):
+    with get_db() as db:
+        save_lead_analysis(db, lead_id, analysis, message)
+
+
+def _save_analyses(results: List[dict]):
+    with get_db() as db:
+        save_lead_analyses(db, [
+            (result['lead']['id'], result.get('analysis', {}), result.get('message'))
+            for result in results
+        ])
+
+
+def _remember_job(job: dict):
+    """Register a job, dropping the oldest finished ones past MAX_ANALYSIS_JOBS"""
+    _analysis_jobs[job['job_id']] = job
+    for job_id in [j for j, old in _analysis_jobs.items() if old['status'] in ('done', 'failed')]:
+        if len(_analysis_jobs) <= MAX_ANALYSIS_JOBS:
+            break
+        del _analysis_jobs[job_id]
+
+
+def _start_job(job: dict, lead_ids: List[int], coro):
+    """Run coro as a background task for job, marking lead_ids in flight until it ends"""
+    _remember_job(job)
+    for lead_id in lead_ids:
+        _inflight_jobs[lead_id] = job
+
+    def finished(task):
+        _analysis_tasks.discard(task)
+        for lead_id in lead_ids:
+            if _inflight_jobs.get(lead_id) is job:
+                del _inflight_jobs[lead_id]
+
+    task = asyncio.create_task(coro)
+    _analysis_tasks.add(task)
+    task.add_done_callback(finished)
+
+
+async def _run_analysis(job: dict, lead_dict: dict):
+    """Analyze one lead and save the result, recording progress on job"""
+    job['status'] = 'running'
+    try:
+        # Run analysis with Claude
+        proc = await _get_processor_async()
+        result = await proc.process_lead_async(lead_dict)
+
+        # Save results to database
+        analysis = result.get('analysis', {})
+        message = result.get('message')
+
+        await asyncio.to_thread(_save_analysis, job['lead_id'], analysis, message)
+
+        job.update(status='done', score=analysis.get('score'))
+    except Exception as e:
+        job.update(status='failed', error=str(e))
+
+
+async def _run_batch_analysis(job: dict, leads: List[dict]):
+    """Analyze several leads and save them together, recording progress on job"""
+    job['status'] = 'running'
+    try:
+        # Up to LEAD_CONCURRENCY LLM calls in flight (the processor's backend
+        # also caps them process-wide); large batches go through the
+        # provider's batch API
+        proc = await _get_processor_async()
+        results = await proc.process_batch_async(leads, max_concurrency=BATCH_CONCURRENCY)
+
+        await asyncio.to_thread(_save_analyses, results)
+
+        job.update(status='done', scores={
+            result['lead']['id']: result.get('analysis', {}).get('score') for result in results
+        })
+    except Exception as e:
+        job.update(status='failed', error=str(e))
+
+
+@router.post("/analyze/batch")
+async def analyze_leads_batch(request: Request, lead_ids: List[int] = Form(...)):
+    """
+    Analyze several leads in one background job.
+
+    Form fields:
+    - lead_ids: Lead IDs (repeat the field), at most MAX_BATCH_LEADS
+
+    The leads are loaded in one query and their results saved in one
+    transaction. Returns 202 with a job id like analyze_lead; the finished
+    job maps each lead ID to its score.
+    """
+    lead_ids = list(dict.fromkeys(lead_ids))
+    if len(lead_ids) > MAX_BATCH_LEADS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_LEADS} leads per batch")
+
+    # Leads already being analyzed are left to the job that has them
+    lead_ids = [lead_id for lead_id in lead_ids if lead_id not in _inflight_jobs]
+    if not lead_ids:
+        raise HTTPException(status_code=409, detail="These leads are already being analyzed")
+
+    leads = await asyncio.to_thread(_leads_for_analysis, lead_ids)
+    # Another request may have started on some of them while these loaded
+    leads = [lead for lead in leads if lead['id'] not in _inflight_jobs]
+    if not leads:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    job = {'job_id': uuid.uuid4().hex, 'lead_ids': [lead['id'] for lead in leads], 'status': 'queued'}
+    _start_job(job, job['lead_ids'], _run_batch_analysis(job, leads))
+
+    return FastJSONResponse({
+        "success": True,
+        "message": f"Analysis of {len(leads)} leads started",
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "lead_ids": job['lead_ids']
+    }, status_code=202)
+
+
+@router.post("/bulk/status")
+def bulk_update_status(
+    request: Request,
+    lead_ids: List[int] = Form(...),
+    status: str = Form(...),
+    notes: Optional[str] = Form(None)
+):
+    """
+    Update the status of several leads in one transaction.
+
+    Form fields:
+    - lead_ids: Lead IDs (repeat the field), at most MAX_BATCH_LEADS
+    - status: New status value
+    - notes: Optional notes about the change
+    """
+    lead_ids = list(dict.fromkeys(lead_ids))
+    if len(lead_ids) > MAX_BATCH_LEADS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_LEADS} leads per request")
+
+    with get_db() as db:
+        updated = update_leads_status(db, lead_ids, status, notes)
+
+    if not updated:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    return FastJSONResponse({
+        "success": True,
+        "message": f"Status of {len(updated)} leads updated to {status}",
+        "status": status,
+        "lead_ids": updated
+    })
+
+
+@router.post("/bulk/tag")
+def bulk_add_tag(
+    request: Request,
+    lead_ids: List[int] = Form(...),
+    tag: str = Form(...)
+):
+    """
+    Add a tag to several leads in one transaction.
+
+    Form fields:
+    - lead_ids: Lead IDs (repeat the field), at most MAX_BATCH_LEADS
+    - tag: Tag to add (leads that already have it are left alone)
+    """
+    lead_ids = list(dict.fromkeys(lead_ids))
+    if len(lead_ids) > MAX_BATCH_LEADS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_LEADS} leads per request")
+
+    with get_db() as db:
+        added = add_tag_to_leads(db, lead_ids, tag)
+
+    return FastJSONResponse({
+        "success": True,
+        "message": f"Tag '{tag}' added to {added} leads",
+        "added": added
+    })
+
+
 @router.post("/{lead_id}/analyze")
 async def analyze_lead(request: Request, lead_id: int):
     """
     Analyze a lead with Claude AI.
 
-    This endpoint triggers the AI analysis and updates the lead.
+    Starts the analysis as a background task and returns 202 with a job id
+    straight away; poll GET /leads/jobs/{job_id} for the outcome. The task
+    keeps running if the client disconnects, and no database session is
+    held open while waiting on the model. While a lead's analysis is
+    running, further requests for it get the same job.
     """
-    with get_db() as db:
-        lead = get_lead_by_id(db, lead_id)
+    job = _inflight_jobs.get(lead_id)
+    if job is None:
+        # Convert to dict for processor
+        lead_dict = await asyncio.to_thread(_lead_for_analysis, lead_id)
 
-        if not lead:
+        if not lead_dict:
             raise HTTPException(status_code=404, detail="Lead not found")
 
-        # Convert to dict for processor
-        lead_dict = {
-            'id': lead.id,
-            'name': lead.name,
-            'title': lead.title,
-            'company': lead.company,
-            'source': lead.source,
-            'url': lead.url,
-            'content': lead.content,
-            'date': lead.created_at.strftime('%Y-%m-%d') if lead.created_at else None
-        }
-
-        try:
-            # Run analysis with Claude
-            proc = get_processor()
-            result = proc.process_lead(lead_dict)
+        # A concurrent request for this lead may have started one meanwhile
+        job = _inflight_jobs.get(lead_id)
+        if job is None:
+            job = {'job_id': uuid.uuid4().hex, 'lead_id': lead_id, 'status': 'queued'}
+            _start_job(job, [lead_id], _run_analysis(job, lead_dict))
 
-            # Save results to database
-            analysis = result.get('analysis', {})
-            message = result.get('message')
+    return FastJSONResponse({
+        "success": True,
+        "message": "Lead analysis started",
+        "job_id": job['job_id'],
+        "status": job['status'],
+        "lead_id": lead_id
+    }, status_code=202)
 
-            save_lead_analysis(db, lead_id, analysis, message)
 
-            # Return success response (htmx will reload page)
-            return JSONResponse({
-                "success": True,
-                "message": "Lead analyzed successfully",
-                "score": analysis.get('score'),
-                "lead_id": lead_id
-            })
+@router.get("/jobs/{job_id}")
+async def analysis_job(job_id: str):
+    """
+    Status of a background analysis.
 
-        except Exception as e:
-            return JSONResponse({
-                "success": False,
-                "error": str(e)
-            }, status_code=500)
+    status is 'queued', 'running', 'done' (with score, or scores by lead
+    ID for a batch) or 'failed' (with error).
+    """
+    job = _analysis_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return FastJSONResponse(job)
 
 
 @router.post("/{lead_id}/status")
-async def update_status(
+def update_status(
     request: Request,
     lead_id: int,
     status: str = Form(...),
@@ -265,7 +567,7 @@ async def update_status(
         if not lead:
             raise HTTPException(status_code=404, detail="Lead not found")
 
-    return JSONResponse({
+    return FastJSONResponse({
         "success": True,
         "message": f"Status updated to {status}",
         "status": status
@@ -273,27 +575,24 @@ async def update_status(
 
 
 @router.post("/{lead_id}/tag")
-async def add_tag(
+def add_tag(
     request: Request,
     lead_id: int,
     tag: str = Form(...)
 ):
     """Add a tag to a lead"""
     with get_db() as db:
-        lead = get_lead_by_id(db, lead_id)
-        if not lead:
+        if add_tag_to_lead(db, lead_id, tag) is None:
             raise HTTPException(status_code=404, detail="Lead not found")
 
-        add_tag_to_lead(db, lead_id, tag)
-
-    return JSONResponse({
+    return FastJSONResponse({
         "success": True,
         "message": f"Tag '{tag}' added"
     })
 
 
 @router.delete("/{lead_id}")
-async def remove_lead(request: Request, lead_id: int):
+def remove_lead(request: Request, lead_id: int):
     """Delete a lead"""
     with get_db() as db:
         success = delete_lead(db, lead_id)
@@ -301,7 +600,7 @@ async def remove_lead(request: Request, lead_id: int):
         if not success:
             raise HTTPException(status_code=404, detail="Lead not found")
 
-    return JSONResponse({
+    return FastJSONResponse({
         "success": True,
         "message": "Lead deleted successfully"
     })